@@ -0,0 +1,265 @@
+import json #format request dan response
+import time #mengukur batas waktu micro-batch
+import queue #antrian request untuk micro-batching
+import logging #mencatat aktivitas layanan
+import argparse #argumen command line
+import signal #shutdown saat container dihentikan
+import threading #thread micro-batcher
+from concurrent.futures import Future, ThreadPoolExecutor #worker pool untuk request HTTP
+from http.server import BaseHTTPRequestHandler, HTTPServer #server HTTP bawaan Python
+import numpy as np #untuk komputasi numerik
+import pandas as pd #analisis data
+from model_registry import load_model_and_scaler, get_stats #registry model yang dimuat sekali per proses
+from metrics import render_prometheus #metrik format Prometheus
+from model_router import predict_features_routed, get_routed_models, get_model_stats #routing A/B dan model shadow
+from prediction import validate_input_data, predict_diabetes_batch, encode_features #pipeline prediksi
+from recommendations import get_feature_recommendations, get_feature_recommendations_batch #rekomendasi kesehatan
+from result_cache import prediction_cache #statistik cache hasil prediksi
+from feature_encoding import get_encoders #label kategori -> kode model
+from config import (FEATURE_COLUMNS,
+                    API_HOST, API_PORT, API_WORKERS, API_BATCH_MAX_SIZE, API_BATCH_WINDOW_MS)
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Function to convert one JSON record into the model input vector
+# Kolom kategori boleh berupa label (mis. "Laki-laki") atau kode, sama seperti prediksi massal
+def parse_record(record):
+    if not isinstance(record, dict):
+        raise ValueError("Setiap data pasien harus berupa objek JSON")
+    missing = [column for column in FEATURE_COLUMNS if column not in record]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+    encoders = get_encoders()
+    input_data = []
+    for column in FEATURE_COLUMNS:
+        value = record[column]
+        encoder = encoders.get(column)
+        code = encoder.encode_one(value) if encoder is not None and isinstance(value, str) else None
+        try:
+            input_data.append(float(value if code is None else code))
+        except (TypeError, ValueError):
+            raise ValueError(f"Kolom {column} harus berupa angka atau label kategori yang dikenal")
+    return input_data
+
+# Menggabungkan request tunggal yang datang bersamaan menjadi satu panggilan predict
+class MicroBatcher:
+    def __init__(self, max_size=API_BATCH_MAX_SIZE, window_ms=API_BATCH_WINDOW_MS):
+        self.max_size = max_size
+        self.window = window_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    # Function to queue one validated input vector, hasilnya diambil lewat Future
+    def submit(self, input_data):
+        future = Future()
+        self._queue.put((input_data, future))
+        return future
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Kembalikan sinyal berhenti agar diproses setelah batch ini selesai
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                _, scaler = load_model_and_scaler()
+                features = np.asarray([input_data for input_data, _ in batch], dtype=np.float64)
+                results, _ = predict_features_routed(features, scaler)
+            except Exception as e:
+                logging.error(f"Error in micro-batch prediction: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+
+# HTTP server yang memproses koneksi di worker pool berukuran tetap
+class PooledHTTPServer(HTTPServer):
+    def __init__(self, server_address, handler_class, workers=API_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-worker')
+        self.batcher = MicroBatcher()
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        self.batcher.stop()
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = 5  # koneksi keep-alive yang menganggur dilepas agar worker tidak tertahan
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_text(self, status, body):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self.send_json(200, {'registry': get_stats(), 'models': get_model_stats(),
+                                 'cache': prediction_cache.stats()})
+        elif self.path == '/metrics':
+            self.send_text(200, render_prometheus())
+        else:
+            self.send_json(404, {'error': 'Endpoint tidak ditemukan'})
+
+    def do_POST(self):
+        try:
+            body = self.read_json()
+        except (ValueError, UnicodeDecodeError):
+            self.send_json(400, {'error': 'Body harus berupa JSON yang valid'})
+            return
+
+        if self.path == '/predict':
+            self.handle_predict(body)
+        elif self.path == '/predict/batch':
+            self.handle_predict_batch(body)
+        else:
+            self.send_json(404, {'error': 'Endpoint tidak ditemukan'})
+
+    def handle_predict(self, record):
+        try:
+            input_data = parse_record(record)
+            validate_input_data(input_data)
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        try:
+            result = self.server.batcher.submit(input_data).result()
+        except Exception as e:
+            self.send_json(500, {'error': f"Error during prediction: {e}"})
+            return
+
+        self.send_json(200, {
+            'result': result,
+            'recommendations': get_feature_recommendations(result, input_data)
+        })
+
+    def handle_predict_batch(self, records):
+        if isinstance(records, dict):
+            records = records.get('records')
+        if not isinstance(records, list) or not records:
+            self.send_json(400, {'error': 'Body harus berupa daftar data pasien'})
+            return
+        if not all(isinstance(record, dict) for record in records):
+            self.send_json(400, {'error': 'Setiap data pasien harus berupa objek JSON'})
+            return
+
+        try:
+            model, scaler = load_model_and_scaler()
+            output = predict_diabetes_batch(pd.DataFrame.from_records(records), model, scaler)
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': f"Error during batch prediction: {e}"})
+            return
+
+        try:
+            # Rekomendasi memakai fitur yang sudah di-encode (kolom kategori bisa berupa label teks)
+            valid = output['Hasil'].notna().to_numpy()
+            recommendations = iter(get_feature_recommendations_batch(
+                output['Hasil'].to_numpy()[valid],
+                encode_features(output)[valid]
+            ))
+        except Exception as e:
+            self.send_json(500, {'error': f"Error during batch prediction: {e}"})
+            return
+        results = []
+        for result, reason in zip(output['Hasil'], output['Alasan Ditolak']):
+            if result is None:
+                results.append({'result': None, 'error': reason})
+            else:
+                results.append({'result': result, 'recommendations': next(recommendations)})
+        self.send_json(200, {'results': results})
+
+# Function to start the prediction service
+def run_server(host=API_HOST, port=API_PORT, workers=API_WORKERS):
+    # Warm-up: semua model dimuat sebelum menerima request pertama
+    load_model_and_scaler()
+    get_routed_models()
+
+    server = PooledHTTPServer((host, port), PredictionHandler, workers=workers)
+    server.batcher.start()
+    logging.info(f"Prediction API listening on http://{host}:{port} ({workers} workers)")
+
+    # SIGTERM (misalnya dari orchestrator container) menghentikan server dengan rapi
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info("Prediction API stopped")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Layanan API prediksi diabetes")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=API_WORKERS)
+    args = parser.parse_args()
+    run_server(args.host, args.port, args.workers)
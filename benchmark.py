@@ -0,0 +1,241 @@
+import os #mengelola file sementara
+import sys #kode keluar saat ada regresi
+import json #format hasil benchmark
+import time #mengukur latensi
+import argparse #argumen command line
+import platform #informasi lingkungan pengujian
+import tempfile #database riwayat sementara
+import tracemalloc #mengukur puncak penggunaan memori
+import numpy as np #untuk komputasi numerik
+import pandas as pd #analisis data
+import model_registry #registry model
+from main import predict_diabetes, calculate_bmi #fungsi yang dipakai halaman Streamlit
+from prediction import predict_diabetes_batch, validate_batch #prediksi massal
+from recommendations import get_recommendations, get_recommendations_batch #rekomendasi kesehatan
+from history_store import SQLiteHistoryStore, WriteBehindHistoryStore #penyimpanan riwayat
+from columnar_store import read_dataset #dataset uji dari salinan Parquet
+from feature_encoding import get_encoders, check_encoding #kode kategori -> label tampilan
+from compiled_tree import check_parity #kesamaan hasil decision tree terkompilasi dengan sklearn
+from drift_monitor import check_baseline #baseline drift sesuai dengan encoding input aplikasi
+from config import FEATURE_COLUMNS
+
+TEST_DATA = 'dataset/test_data_before_scaling.csv'
+HISTORY_SIZES = [1000, 100000, 1000000]
+# Jumlah sampel minimum agar suatu metrik dibandingkan dengan baseline
+# (p95 dari beberapa sampel saja pada dasarnya hanya sampel paling lambat)
+MIN_SAMPLES = {'p50_ms': 20, 'p95_ms': 200}
+
+# Function to time a callable and summarize latency, throughput and peak memory
+def measure(function, repeat, warmup=3, items=1):
+    for _ in range(warmup):
+        function()
+
+    durations = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations[i] = time.perf_counter() - start
+
+    # Memori diukur terpisah karena tracemalloc memperlambat eksekusi
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+    return {
+        'repeat': repeat,
+        'p50_ms': p50 * 1e3,
+        'p95_ms': p95 * 1e3,
+        'p99_ms': p99 * 1e3,
+        'throughput_per_s': items * repeat / durations.sum(),
+        'peak_memory_kb': peak / 1024,
+    }
+
+# Function to build history records from the test dataset
+def history_records(data, count):
+    rows = data.sample(n=count, replace=count > len(data), random_state=42)
+    encoders = get_encoders()
+    # Label tampilan per kolom di-decode sekaligus untuk semua baris
+    labels = {column: encoders[column].decode(rows[column])
+              for column in ['gender', 'hypertension', 'heart_disease', 'smoking_history']}
+    return [{
+        'Waktu': f"2026-01-{1 + i % 28:02d} 08:00:00",
+        'Nama': f"Pasien {i}",
+        'Jenis Kelamin': labels['gender'][i],
+        'Usia': row.age,
+        'Hipertensi': labels['hypertension'][i],
+        'Penyakit Jantung': labels['heart_disease'][i],
+        'Riwayat Merokok': labels['smoking_history'][i],
+        'BMI': row.bmi,
+        'Level HbA1c': row.HbA1c_level,
+        'Glukosa Darah': row.blood_glucose_level,
+        'Hasil': 'Diabetes' if row.diabetes == 1 else 'Non-Diabetes',
+    } for i, row in enumerate(rows.itertuples(index=False))]
+
+def bench_model_load(results, repeat):
+    def cold_load():
+        model_registry.clear_registry()
+        model_registry.load_model_and_scaler()
+
+    results['model_load_cold'] = measure(cold_load, max(repeat // 20, 3), warmup=1)
+    results['model_load_warm'] = measure(model_registry.load_model_and_scaler, repeat)
+
+def bench_prediction(results, data, repeat):
+    model, scaler = model_registry.load_model_and_scaler()
+    features = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    # Prediksi tunggal hanya memakai baris valid, sama seperti input dari form Streamlit
+    valid, _ = validate_batch(features)
+    rows = features[valid].tolist()
+    position = iter(range(10 ** 12))
+
+    def single():
+        predict_diabetes(rows[next(position) % len(rows)], model, scaler)
+
+    results['predict_single'] = measure(single, repeat)
+    results['predict_batch'] = measure(lambda: predict_diabetes_batch(data, model, scaler, monitor=False),
+                                       max(repeat // 100, 5), items=len(data))
+
+def bench_recommendations(results, data, repeat):
+    rows = data.to_dict('records')
+    smoking_labels = get_encoders()['smoking_history'].decode(data['smoking_history'])
+    for row, label in zip(rows, smoking_labels):
+        row['smoking_label'] = label
+    position = iter(range(10 ** 12))
+
+    def recommend():
+        row = rows[next(position) % len(rows)]
+        get_recommendations(
+            'Diabetes' if row['diabetes'] == 1 else 'Non-Diabetes',
+            row['bmi'],
+            row['blood_glucose_level'],
+            row['HbA1c_level'],
+            row['smoking_label'],
+            row['hypertension'] == 1,
+            row['heart_disease'] == 1,
+            row['age']
+        )
+
+    results['get_recommendations'] = measure(recommend, repeat)
+    results['get_recommendations_batch'] = measure(lambda: get_recommendations_batch(
+        np.where(data['diabetes'] == 1, 'Diabetes', 'Non-Diabetes'),
+        data['bmi'].to_numpy(),
+        data['blood_glucose_level'].to_numpy(),
+        data['HbA1c_level'].to_numpy(),
+        smoking_labels,
+        data['hypertension'].to_numpy() == 1,
+        data['heart_disease'].to_numpy() == 1,
+        data['age'].to_numpy()
+    ), max(repeat // 100, 5), items=len(data))
+    results['calculate_bmi'] = measure(lambda: calculate_bmi(70.0, 170.0), repeat)
+
+def bench_history(results, data, sizes, repeat):
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteHistoryStore(os.path.join(directory, 'history.db'), legacy_csv=None)
+            records = history_records(data, min(size, 100000))
+            for start in range(0, size, len(records)):
+                store._insert(records[:size - start])
+
+            # Pembacaan diukur sebelum penulisan agar ukuran riwayat tepat sama dengan label benchmark
+            results[f'history_count_{size}'] = measure(lambda: store.count(name='Pasien 1'), repeat // 10)
+            results[f'load_history_page_{size}'] = measure(lambda: store.query(limit=50), repeat // 10)
+            results[f'load_history_deep_page_{size}'] = measure(
+                lambda: store.query(limit=50, offset=size // 2), max(repeat // 100, 3))
+            results[f'history_aggregates_{size}'] = measure(lambda: store.aggregates('day'), repeat // 10)
+            if size <= 100000:
+                results[f'load_history_full_{size}'] = measure(lambda: store.query(), 3, warmup=1, items=size)
+
+            record = records[0]
+            results[f'save_to_history_{size}'] = measure(lambda: store.append([record]), repeat)
+            results[f'history_flush_{size}'] = measure(lambda: (store.append([record]), store.flush()), repeat // 10)
+            # Write-behind: simpan hanya memasukkan record ke antrian, penulisan ke SQLite di thread background
+            write_behind = WriteBehindHistoryStore(store)
+            results[f'save_to_history_write_behind_{size}'] = measure(lambda: write_behind.append([record]), repeat)
+            write_behind.close()
+
+# Function to run every benchmark scenario
+def run(sizes=HISTORY_SIZES, repeat=1000):
+    data = read_dataset(TEST_DATA)
+    results = {}
+    bench_model_load(results, repeat)
+    bench_prediction(results, data, repeat)
+    bench_recommendations(results, data, repeat)
+    bench_history(results, data, sizes, repeat)
+    vectorized_mismatch, scalar_mismatch = check_parity(*model_registry.load_model_and_scaler(), TEST_DATA)
+    encoding_mismatches = check_encoding()
+    drift_failures = [{key: row[key] for key in ['data', 'feature', 'status', 'psi']} for row in check_baseline()]
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'params': {'sizes': list(sizes), 'repeat': repeat},
+        'results': results,
+        'compiled_parity': {'vectorized_mismatches': vectorized_mismatch, 'scalar_mismatches': scalar_mismatch},
+        'encoding_mismatches': encoding_mismatches,
+        'drift_baseline_failures': drift_failures,
+    }
+
+# Function to compare results with a saved baseline
+# Regresi jika lebih lambat dari toleransi relatif dan juga dari selisih minimum (menyaring noise mikrodetik)
+# Hanya hasil dengan parameter yang sama yang dapat dibandingkan (raise ValueError jika berbeda)
+def compare(current, baseline, tolerance, min_delta_ms=0.01, min_samples=MIN_SAMPLES):
+    if current.get('params') != baseline.get('params'):
+        raise ValueError(f"Parameter benchmark berbeda dengan baseline: {current.get('params')} vs {baseline.get('params')}")
+    regressions = []
+    for name, stats in current['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        for metric in ['p50_ms', 'p95_ms']:
+            if min(stats['repeat'], previous['repeat']) < min_samples[metric]:
+                continue
+            slower = stats[metric] > previous[metric] * (1 + tolerance)
+            if slower and stats[metric] - previous[metric] > min_delta_ms:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': stats[metric],
+                    'change': stats[metric] / previous[metric] - 1,
+                })
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark jalur prediksi, rekomendasi dan riwayat")
+    parser.add_argument('--output', help="simpan hasil ke file JSON (mis. untuk dijadikan baseline)")
+    parser.add_argument('--baseline', help="file JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="batas perlambatan yang diizinkan (0.2 = 20%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.01, help="selisih minimum agar dianggap regresi")
+    parser.add_argument('--sizes', type=int, nargs='+', default=HISTORY_SIZES, help="jumlah baris riwayat")
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        # Dicek sebelum benchmark dijalankan agar tidak menunggu lama untuk perbandingan yang tidak valid
+        params = {'sizes': args.sizes, 'repeat': args.repeat}
+        if baseline.get('params') != params:
+            sys.exit(f"Parameter benchmark berbeda dengan baseline: {params} vs {baseline.get('params')}")
+
+    report = run(args.sizes, args.repeat)
+    if baseline is not None:
+        report['regressions'] = compare(report, baseline, args.tolerance, args.min_delta_ms)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    print(output)
+
+    # Prediksi yang lebih cepat tidak ada gunanya jika hasilnya berbeda dari sklearn, kode kategori
+    # tidak sama dengan data latih model, atau baseline drift tidak cocok dengan input aplikasi
+    parity = report['compiled_parity']
+    if (report.get('regressions') or parity['vectorized_mismatches'] or parity['scalar_mismatches']
+            or report['encoding_mismatches'] or report['drift_baseline_failures']):
+        sys.exit(1)
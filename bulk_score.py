@@ -0,0 +1,105 @@
+# Skoring massal file CSV pasien yang besar dari command line
+# File dibaca per chunk, setiap chunk diproses oleh worker di process pool (parsing, encoding,
+# validasi range dan prediksi), lalu hasilnya ditulis sesuai urutan baris input
+import io #membaca chunk CSV dari teks
+import os #jumlah core CPU
+import csv #membaca header file input
+import sys #exit code
+import time #mengukur throughput
+import argparse #argumen command line
+from collections import Counter, deque #rekap hasil dan antrian chunk
+from itertools import islice #membaca file per blok baris
+from concurrent.futures import ProcessPoolExecutor #worker paralel
+import pandas as pd #analisis data
+from model_registry import load_model_and_scaler #model yang dimuat sekali per worker
+from prediction import predict_diabetes_batch #encoding, validasi dan prediksi yang sama dengan prediksi massal
+from config import FEATURE_COLUMNS, BULK_CHUNK_SIZE, BULK_MAX_PENDING
+
+OUTPUT_COLUMNS = ['Hasil', 'Alasan Ditolak']
+
+# Model dan scaler milik proses worker ini
+_model = None
+_scaler = None
+
+# Function to load the model once in each worker process
+def init_worker():
+    global _model, _scaler
+    _model, _scaler = load_model_and_scaler()
+
+# Function to score one chunk of CSV lines, hasilnya berupa teks CSV tanpa header dan rekap hasil
+def score_chunk(header, lines):
+    data = pd.read_csv(io.StringIO(header + lines))
+    # Skoring file offline tidak dicatat ke monitoring drift (hanya input dari aplikasi dan API)
+    output = predict_diabetes_batch(data, _model, _scaler, monitor=False)
+    counts = Counter(output['Hasil'].fillna('Ditolak'))
+    return output.to_csv(index=False, header=False, lineterminator='\n'), counts
+
+# Function to read the input file in blocks of lines (satu baris = satu pasien)
+def read_chunks(path, chunksize):
+    with open(path, newline='') as file:
+        header = file.readline()
+        while True:
+            lines = ''.join(islice(file, chunksize))
+            if not lines:
+                return
+            yield header, lines
+
+def check_header(path):
+    with open(path, newline='') as file:
+        columns = next(csv.reader(file), [])
+    missing = [column for column in FEATURE_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+    return columns
+
+# Function to score a whole file; paling banyak workers * max_pending chunk ada di memori sekaligus
+def score_file(input_path, output_path, workers, chunksize=BULK_CHUNK_SIZE, max_pending=BULK_MAX_PENDING):
+    columns = check_header(input_path)
+    totals = Counter()
+
+    with open(output_path, 'w', newline='') as output:
+        csv.writer(output, lineterminator='\n').writerow(columns + OUTPUT_COLUMNS)
+
+        def write(scored):
+            text, counts = scored
+            output.write(text)
+            totals.update(counts)
+
+        if workers == 1:
+            init_worker()
+            for header, lines in read_chunks(input_path, chunksize):
+                write(score_chunk(header, lines))
+            return totals
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            pending = deque()
+            for header, lines in read_chunks(input_path, chunksize):
+                pending.append(pool.submit(score_chunk, header, lines))
+                # Chunk ditulis sesuai urutan input; pembacaan berhenti sementara jika antrian penuh
+                if len(pending) >= workers * max_pending:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return totals
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Skoring massal file CSV pasien dengan process pool")
+    parser.add_argument('input', help="file CSV dengan kolom FEATURE_COLUMNS (angka atau label seperti di menu Prediksi)")
+    parser.add_argument('--output', default='hasil_prediksi_massal.csv')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="jumlah proses worker (1 = tanpa process pool)")
+    parser.add_argument('--chunksize', type=int, default=BULK_CHUNK_SIZE, help="jumlah baris per chunk")
+    parser.add_argument('--max-pending', type=int, default=BULK_MAX_PENDING, help="chunk yang diproses bersamaan per worker")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        totals = score_file(args.input, args.output, args.workers, args.chunksize, args.max_pending)
+    except (OSError, ValueError) as e:
+        print(f"Error during bulk scoring: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    rows = sum(totals.values())
+    print(f"Scored {rows} rows in {elapsed:.2f} s ({rows / elapsed:.0f} rows/s, {args.workers} workers) -> {args.output}")
+    for label in ['Diabetes', 'Non-Diabetes', 'Ditolak']:
+        print(f"  {label}: {totals.get(label, 0)}")
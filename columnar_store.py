@@ -0,0 +1,154 @@
+# Penyimpanan kolumnar (Parquet) untuk dataset dan riwayat prediksi
+# File CSV dikonversi sekali ke Parquet dengan tipe data ringkas, lalu pembacaan berikutnya hanya
+# mengambil kolom (projection) dan row group/baris (predicate pushdown) yang dibutuhkan
+import os #mengecek file hasil konversi
+import time #mengukur waktu baca pada laporan
+import argparse #argumen command line
+import tempfile #file sementara untuk penulisan atomik
+import numpy as np #tipe data ringkas
+import pandas as pd #analisis data
+import pyarrow as pa #format kolumnar
+import pyarrow.dataset as ds #pembacaan dengan projection dan filter
+import pyarrow.parquet as pq #menulis file Parquet
+from config import COLUMNAR_CHUNK_SIZE, COLUMNAR_COMPRESSION
+
+# Tipe data ringkas per kolom dataset dan riwayat
+FLAG_COLUMNS = ['hypertension', 'heart_disease', 'diabetes']
+MEASUREMENT_COLUMNS = ['age', 'bmi', 'HbA1c_level', 'blood_glucose_level',
+                       'Usia', 'BMI', 'Level HbA1c', 'Glukosa Darah']
+# Kolom kategori: teks disimpan sebagai categorical (dictionary), kode angka sebagai int8
+CATEGORY_COLUMNS = ['gender', 'smoking_history', 'Jenis Kelamin', 'Hipertensi', 'Penyakit Jantung',
+                    'Riwayat Merokok', 'Hasil']
+TIMESTAMP_COLUMNS = ['Waktu']
+
+# Function to get the Parquet path of a CSV file (disimpan berdampingan dengan file CSV)
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+# Function to cast one chunk to the compact dtypes
+def compact_dtypes(data):
+    data = data.copy()
+    for column in data.columns:
+        values = data[column]
+        if column in FLAG_COLUMNS:
+            data[column] = pd.to_numeric(values, errors='coerce').astype('Int8')
+        elif column in MEASUREMENT_COLUMNS:
+            data[column] = pd.to_numeric(values, errors='coerce').astype(np.float32)
+        elif column in CATEGORY_COLUMNS:
+            if pd.api.types.is_numeric_dtype(values):
+                data[column] = values.astype('Int8')
+            else:
+                data[column] = values.astype('category')
+        elif column in TIMESTAMP_COLUMNS:
+            data[column] = pd.to_datetime(values, errors='coerce')
+    return data
+
+# Function to create a unique temporary file next to the target (proses lain yang menulis bersamaan tidak bertabrakan)
+def _temporary_path(path):
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    os.close(descriptor)
+    return temporary
+
+# Function to convert a CSV file to Parquet chunk by chunk (satu chunk = satu row group)
+def convert_csv(csv_path, parquet_path=None, chunksize=COLUMNAR_CHUNK_SIZE):
+    parquet_path = parquet_path or columnar_path(csv_path)
+    temporary = _temporary_path(parquet_path)
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            table = pa.Table.from_pandas(compact_dtypes(chunk), preserve_index=False)
+            if writer is None:
+                # Kategori dapat berbeda per chunk, skema memakai dictionary string dengan indeks int32
+                schema = pa.schema([pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+                                    if pa.types.is_dictionary(field.type) else field for field in table.schema])
+                writer = pq.ParquetWriter(temporary, schema, compression=COLUMNAR_COMPRESSION)
+            writer.write_table(table.cast(schema))
+        if writer is None:
+            raise ValueError(f"File kosong: {csv_path}")
+        writer.close()
+        # Diganti secara atomik agar pembaca tidak melihat file setengah jadi
+        os.replace(temporary, parquet_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return parquet_path
+
+# Function to get an up-to-date Parquet file for a path (dikonversi ulang jika CSV lebih baru)
+def ensure_columnar(path):
+    if path.endswith('.parquet'):
+        return path
+    parquet_path = columnar_path(path)
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(path):
+        convert_csv(path, parquet_path)
+    return parquet_path
+
+def _dataset(path, filters):
+    dataset = ds.dataset(ensure_columnar(path), format='parquet')
+    # filters: [(kolom, operator, nilai), ...] digabung dengan AND, mis. [('age', '>=', 60)]
+    expression = pq.filters_to_expression(filters) if filters else None
+    return dataset, expression
+
+# Function to read a dataset, hanya kolom dan baris yang dibutuhkan
+def read_dataset(path, columns=None, filters=None):
+    dataset, expression = _dataset(path, filters)
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+# Function to read a dataset in batches (memori dibatasi oleh batch_size)
+def iter_dataset(path, columns=None, filters=None, batch_size=COLUMNAR_CHUNK_SIZE):
+    dataset, expression = _dataset(path, filters)
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+# Function to write a history DataFrame as a typed Parquet snapshot (mis. hasil query history store)
+def export_history(history, parquet_path):
+    temporary = _temporary_path(parquet_path)
+    try:
+        pq.write_table(pa.Table.from_pandas(compact_dtypes(history), preserve_index=False), temporary,
+                       compression=COLUMNAR_COMPRESSION)
+        os.replace(temporary, parquet_path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return parquet_path
+
+def _measure(read):
+    start = time.perf_counter()
+    data = read()
+    return time.perf_counter() - start, data.memory_usage(deep=True).sum()
+
+# Function to compare CSV and Parquet for one file (ukuran, waktu baca dan memori)
+def report(csv_path, columns=None):
+    parquet_path = convert_csv(csv_path)
+    csv_seconds, csv_memory = _measure(lambda: pd.read_csv(csv_path, usecols=columns))
+    parquet_seconds, parquet_memory = _measure(lambda: read_dataset(parquet_path, columns=columns))
+    return {
+        'csv_bytes': os.path.getsize(csv_path),
+        'parquet_bytes': os.path.getsize(parquet_path),
+        'csv_read_ms': csv_seconds * 1e3,
+        'parquet_read_ms': parquet_seconds * 1e3,
+        'csv_memory_bytes': int(csv_memory),
+        'parquet_memory_bytes': int(parquet_memory),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Konversi file CSV dataset/riwayat ke Parquet dengan tipe data ringkas")
+    parser.add_argument('paths', nargs='*', help="file CSV yang dikonversi")
+    parser.add_argument('--columns', nargs='+', help="kolom yang dibaca saat membandingkan waktu baca dan memori")
+    parser.add_argument('--export-history', metavar='PATH', help="simpan seluruh riwayat prediksi ke file Parquet")
+    args = parser.parse_args()
+
+    if args.export_history:
+        from history_store import get_history_store
+        history = get_history_store().query()
+        export_history(history, args.export_history)
+        print(f"Exported {len(history)} history rows to {args.export_history}")
+
+    for path in args.paths:
+        result = report(path, args.columns)
+        print(f"{path} -> {columnar_path(path)}")
+        print(f"  size   {result['csv_bytes'] / 1024:9.0f} KB -> {result['parquet_bytes'] / 1024:9.0f} KB")
+        print(f"  read   {result['csv_read_ms']:9.1f} ms -> {result['parquet_read_ms']:9.1f} ms")
+        print(f"  memory {result['csv_memory_bytes'] / 1024:9.0f} KB -> {result['parquet_memory_bytes'] / 1024:9.0f} KB")
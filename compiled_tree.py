@@ -0,0 +1,207 @@
+import os #mengganti artefak secara atomik
+import time #mengukur latensi
+import tempfile #file sementara di folder artefak
+import argparse #argumen command line
+import numpy as np #untuk komputasi numerik
+import pandas as pd #analisis data
+import joblib #menyimpan dan memuat artefak
+from config import MODEL_PATH, SCALER_PATH, COMPILED_MODEL_PATH, FEATURE_COLUMNS
+
+PARITY_DATA = 'dataset/test_data_before_scaling.csv'
+
+# Function to fold the scaler into tree thresholds
+# sklearn membandingkan float32((x - mean) / scale) <= t. Fungsi ini monoton terhadap x,
+# jadi ada satu batas mentah T dengan x <= T tepat ketika perbandingan sklearn bernilai benar.
+# T dicari dengan bisection di sekitar t * scale + mean agar hasilnya identik hingga bit terakhir.
+def fold_thresholds(threshold, mean, scale):
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    approx = threshold * scale + mean
+    margin = (np.abs(threshold) + 1) * scale * 1e-5
+    low, high = approx - margin, approx + margin
+    for _ in range(200):
+        unresolved = np.nextafter(low, np.inf) < high
+        if not unresolved.any():
+            break
+        middle = np.where(unresolved, low + (high - low) / 2, low)
+        left = goes_left(middle)
+        low = np.where(unresolved & left, middle, low)
+        high = np.where(unresolved & ~left, middle, high)
+    return low
+
+# Decision tree dalam bentuk array datar, dengan StandardScaler dilipat ke dalam threshold,
+# sehingga prediksi langsung memakai input mentah tanpa langkah transform
+# Objek ini di-pickle sebagai array NumPy biasa, sehingga dapat dimuat dengan joblib mmap_mode
+# tanpa meng-import sklearn sama sekali
+class CompiledTree:
+    def __init__(self, feature, threshold, left, right, label, max_depth=None):
+        # np.asarray tidak menyalin array (termasuk memmap) yang tipenya sudah sesuai
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.label = np.asarray(label, dtype=np.int8)
+        # Daun menunjuk ke dirinya sendiri, jadi penelusuran vektor cukup diulang sebanyak kedalaman pohon
+        self.is_leaf = self.left == np.arange(len(self.left))
+        self.max_depth = self._depth() if max_depth is None else int(max_depth)
+        self._nodes = None
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _depth(self):
+        depth = np.zeros(len(self.left), dtype=np.intp)
+        # Node anak selalu memiliki indeks lebih besar dari induknya pada sklearn
+        for node in range(len(self.left)):
+            if not self.is_leaf[node]:
+                depth[self.left[node]] = depth[self.right[node]] = depth[node] + 1
+        return int(depth.max())
+
+    # Function to build the compiled tree from a fitted sklearn DecisionTreeClassifier and StandardScaler
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        tree = model.tree_
+        n_features = model.n_features_in_
+        mean = np.zeros(n_features) if scaler is None or scaler.mean_ is None else scaler.mean_
+        scale = np.ones(n_features) if scaler is None or scaler.scale_ is None else scaler.scale_
+
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        feature = np.where(is_leaf, 0, tree.feature)
+        threshold = np.where(is_leaf, 0.0, fold_thresholds(tree.threshold, mean[feature], scale[feature]))
+        left = np.where(is_leaf, nodes, tree.children_left)
+        right = np.where(is_leaf, nodes, tree.children_right)
+        label = model.classes_[tree.value[:, 0, :].argmax(axis=1)]
+        return cls(feature, threshold, left, right, label)
+
+    # Function to predict one raw input vector (urutan FEATURE_COLUMNS)
+    def predict_one(self, input_data):
+        nodes = self._nodes
+        if nodes is None:
+            # List Python lebih cepat daripada indexing skalar NumPy untuk penelusuran satu baris
+            nodes = self._nodes = list(zip(self.feature.tolist(), self.threshold.tolist(),
+                                           self.left.tolist(), self.right.tolist(), self.label.tolist()))
+        node = 0
+        while True:
+            feature, threshold, left, right, label = nodes[node]
+            next_node = left if input_data[feature] <= threshold else right
+            if next_node == node:
+                return label
+            node = next_node
+
+    # Function to predict many raw rows at once (array 2D dengan urutan FEATURE_COLUMNS)
+    def predict(self, features):
+        features = np.asarray(features, dtype=np.float64)
+        n_features = features.shape[1]
+        flat = features.ravel()
+        node = np.zeros(len(features), dtype=np.intp)
+        # Hanya baris yang belum sampai di daun yang diproses pada setiap level
+        active = np.arange(len(features))
+        for _ in range(self.max_depth):
+            current = node[active]
+            go_left = flat[active * n_features + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+            if not len(active):
+                break
+        return self.label[node]
+
+    def to_dict(self):
+        return {'feature': self.feature, 'threshold': self.threshold,
+                'left': self.left, 'right': self.right, 'label': self.label,
+                'max_depth': self.max_depth}
+
+    # Function to save the compiled tree (joblib tanpa kompresi agar dapat di-memory-map)
+    # Ditulis ke file sementara lalu rename: file lama mungkin sedang di-memory-map oleh aplikasi
+    def save(self, path=COMPILED_MODEL_PATH):
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        os.close(descriptor)
+        try:
+            joblib.dump(self, temporary, compress=0)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path=COMPILED_MODEL_PATH, mmap_mode='r'):
+        return joblib.load(path, mmap_mode=mmap_mode)
+
+_compiled = {}
+
+# Function to get the compiled tree for a loaded model and scaler (dikompilasi sekali per objek model)
+def get_compiled_tree(model, scaler):
+    key = (id(model), id(scaler))
+    cached = _compiled.get(key)
+    # Simpan referensi objek agar id tidak dipakai ulang setelah model lama dibuang
+    if cached is None or cached[0] is not model or cached[1] is not scaler:
+        if len(_compiled) > 8:
+            _compiled.clear()
+        cached = (model, scaler, CompiledTree.from_sklearn(model, scaler))
+        _compiled[key] = cached
+    return cached[2]
+
+# Function to check that the compiled tree predicts exactly like sklearn
+def verify(compiled, model, scaler, data):
+    features = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    expected = model.predict(scaler.transform(data[FEATURE_COLUMNS]))
+    vectorized = compiled.predict(features)
+    scalar = np.array([compiled.predict_one(row) for row in features.tolist()])
+    return int((vectorized != expected).sum()), int((scalar != expected).sum())
+
+# Function to check parity of the compiled tree on the test dataset, (0, 0) jika identik dengan sklearn
+# Dipakai sebagai gate otomatis oleh benchmark dan CLI ini (kode keluar 1 jika ada selisih)
+def check_parity(model, scaler, data_path=PARITY_DATA):
+    return verify(CompiledTree.from_sklearn(model, scaler), model, scaler, pd.read_csv(data_path))
+
+# Function to compare per-row and batch latency of sklearn and the compiled tree
+def benchmark(compiled, model, scaler, data, repeat=2000):
+    features = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    row = features[0].tolist()
+    row_frame = data[FEATURE_COLUMNS].iloc[[0]]
+
+    def measure(function, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            function()
+        return (time.perf_counter() - start) / count
+
+    return {
+        'sklearn_single_us': measure(lambda: model.predict(scaler.transform(row_frame)), repeat // 10) * 1e6,
+        'compiled_single_us': measure(lambda: compiled.predict_one(row), repeat) * 1e6,
+        'sklearn_batch_ms': measure(lambda: model.predict(scaler.transform(data[FEATURE_COLUMNS])), 5) * 1e3,
+        'compiled_batch_ms': measure(lambda: compiled.predict(features), 5) * 1e3,
+        'rows': len(features),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ekspor decision tree ke array datar dan uji kesamaan hasilnya dengan sklearn")
+    parser.add_argument('--output', default=COMPILED_MODEL_PATH)
+    parser.add_argument('--data', default=PARITY_DATA)
+    parser.add_argument('--benchmark', action='store_true', help="tampilkan perbandingan latensi")
+    args = parser.parse_args()
+
+    # Kelas diambil dari modul compiled_tree, bukan __main__, agar artefak dapat dimuat oleh aplikasi
+    from compiled_tree import CompiledTree
+
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    compiled = CompiledTree.from_sklearn(model, scaler)
+    compiled.save(args.output)
+    print(f"Saved {len(compiled.left)} nodes (depth {compiled.max_depth}) to {args.output}")
+
+    data = pd.read_csv(args.data)
+    vectorized_mismatch, scalar_mismatch = verify(CompiledTree.load(args.output), model, scaler, data)
+    print(f"Parity on {len(data)} rows: {vectorized_mismatch} vectorized / {scalar_mismatch} scalar mismatches")
+
+    if args.benchmark:
+        for name, value in benchmark(compiled, model, scaler, data).items():
+            print(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+
+    if vectorized_mismatch or scalar_mismatch:
+        raise SystemExit(1)
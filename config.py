@@ -1,9 +1,108 @@
-MODEL_PATH = 'model/dt_model.pkl'
-SCALER_PATH = 'model/scaler.pkl'
+# Versi artefak hasil train.py di MODEL_VERSIONS_DIR, None = artefak bawaan di folder model/
+MODEL_VERSION = None
+MODEL_VERSIONS_DIR = 'model/versions'
+MODEL_DIR = f'{MODEL_VERSIONS_DIR}/{MODEL_VERSION}' if MODEL_VERSION else 'model'
+MODEL_PATH = f'{MODEL_DIR}/dt_model.pkl'
+SCALER_PATH = f'{MODEL_DIR}/scaler.pkl'
+COMPILED_MODEL_PATH = f'{MODEL_DIR}/dt_compiled.pkl'
+MODEL_MMAP_MODE = 'r'       # array di dalam artefak tanpa kompresi di-memory-map, bukan dibaca ke memori
+USE_COMPILED_TREE = True    # prediksi memakai decision tree terkompilasi (hasil sama dengan sklearn)
+USE_COMPILED_ARTIFACT = False  # cold start dari dt_compiled.pkl saja, tanpa unpickle model/scaler sklearn
+
+# Routing model (nama model = nama file di MODEL_DIR tanpa ekstensi)
+PRIMARY_MODEL = 'dt_compiled' if USE_COMPILED_ARTIFACT else 'dt_model'
+MODEL_WEIGHTS = {PRIMARY_MODEL: 1.0}    # bobot pembagian request untuk hasil yang ditampilkan
+# Dinilai di background, tidak memengaruhi hasil yang ditampilkan (model sklearn butuh scaler)
+SHADOW_MODELS = [] if USE_COMPILED_ARTIFACT else ['nb_model']
+SHADOW_MAX_PENDING = 256    # batas job shadow yang menunggu, job berikutnya dilewati (dihitung di metrik)
+
 HISTORY_FILE = 'prediction_history.csv'
 
+# Penyimpanan riwayat prediksi
+HISTORY_BACKEND = 'sqlite'          # 'sqlite' (default) atau 'csv' (format lama)
+HISTORY_DB = 'prediction_history.db'
+HISTORY_BUFFER_SIZE = 20            # jumlah record yang ditampung sebelum ditulis sekaligus
+HISTORY_WRITE_BEHIND = True         # riwayat ditulis oleh thread background, simpan dari request langsung kembali
+HISTORY_FLUSH_INTERVAL = 1.0        # detik, batas waktu record menunggu di antrian sebelum ditulis
+HISTORY_QUEUE_SIZE = 10000          # jumlah record maksimal di antrian (backpressure jika penuh)
+HISTORY_QUEUE_TIMEOUT = 5.0         # detik, lama menunggu antrian yang penuh sebelum simpan dianggap gagal
+
+# Kelompok untuk agregat riwayat: (batas bawah, label)
+AGE_BANDS = [(0, '0-17'), (18, '18-29'), (30, '30-44'), (45, '45-59'), (60, '60+')]
+BMI_BANDS = [(0, 'Kekurangan Berat Badan'), (18.5, 'Normal'), (25, 'Kelebihan Berat Badan'), (30, 'Obesitas')]
+
+# Visualisasi riwayat: jumlah titik maksimal grafik tren sebelum otomatis digabung per minggu/bulan
+ANALYTICS_MAX_POINTS = 180
+
+# Cache hasil prediksi tunggal + rekomendasi (dibuang otomatis jika artefak model dimuat ulang)
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_TTL = 3600     # detik, None = tanpa batas waktu
+
 # Batasan nilai
 AGE_RANGE = (0, 120)
 BMI_RANGE = (10, 50)
 HBA1C_RANGE = (3, 15)
 GLUCOSE_RANGE = (50, 300)
+
+# Urutan fitur input model
+FEATURE_COLUMNS = ['gender', 'age', 'hypertension', 'heart_disease', 'smoking_history',
+                   'bmi', 'HbA1c_level', 'blood_glucose_level']
+
+# Kode fitur kategori (dipakai oleh feature_encoding.py), sesuai kode pada data latih model (dataset_seimbang.csv)
+# Riwayat merokok: kelas dataset asli -> kode model (ever dan never digabung menjadi satu kode saat training)
+SMOKING_HISTORY_CODES = {
+    'No Info': 1,
+    'never': 2,
+    'ever': 2,
+    'former': 3,
+    'current': 4,
+    'not current': 5,
+}
+# Kode model -> label tampilan
+SMOKING_HISTORY_LABELS = {
+    1: 'Tidak Ada Info',
+    2: 'Tidak Pernah',
+    3: 'Mantan Perokok',
+    4: 'Perokok Aktif',
+    5: 'Sudah Tidak Merokok',
+}
+SMOKING_HISTORY_OPTIONS = ['Tidak Pernah', 'Mantan Perokok', 'Perokok Aktif']  # pilihan di menu Prediksi
+
+# Jenis kelamin: label tampilan (kode model = urutan, Perempuan = 0) dan kelas dataset asli -> kode model
+GENDER_LABELS = ['Perempuan', 'Laki-laki']
+GENDER_CODES = {'Female': 0, 'Male': 1}
+YES_NO_LABELS = ['Tidak', 'Ya']    # kode model = urutan, Tidak = 0
+
+# Layanan API (tanpa Streamlit)
+API_HOST = '0.0.0.0'
+API_PORT = 8000
+API_WORKERS = 16
+API_BATCH_MAX_SIZE = 64     # jumlah maksimal request tunggal yang digabung dalam satu predict
+API_BATCH_WINDOW_MS = 2     # waktu tunggu maksimal untuk mengumpulkan satu micro-batch
+
+# Metrik performa
+METRICS_DUMP_PATH = 'metrics.json'
+METRICS_DUMP_INTERVAL = 60  # detik
+
+# Penyimpanan kolumnar dataset/riwayat (columnar_store.py)
+COLUMNAR_CHUNK_SIZE = 50000     # jumlah baris per row group Parquet
+COLUMNAR_COMPRESSION = 'zstd'
+
+# Skoring massal dari command line (bulk_score.py)
+BULK_CHUNK_SIZE = 20000     # jumlah baris per chunk yang dikirim ke satu worker
+BULK_MAX_PENDING = 2        # chunk yang diproses bersamaan per worker (membatasi pemakaian memori)
+
+# Batas waktu import main.py saat cold start (detik), diperiksa oleh startup.py
+COLD_START_BUDGET = 1.0
+
+# Monitoring drift input terhadap data latih (drift_monitor.py)
+DRIFT_TRAINING_DATA = 'dataset/train_data_before_scaling.csv'
+DRIFT_BASELINE_PATH = f'{MODEL_DIR}/drift_baseline.json'   # dibuat dari DRIFT_TRAINING_DATA jika belum ada
+DRIFT_BINS = 10                 # jumlah bin kuantil per fitur numerik
+DRIFT_WINDOW = 1000             # input per jendela, perbandingan memakai jendela aktif + jendela sebelumnya
+DRIFT_MIN_OBSERVATIONS = 200    # status warning/alert hanya diberikan setelah jumlah input ini
+DRIFT_CHECK_INTERVAL = 100      # pengecekan alert setiap sekian input
+DRIFT_PSI_WARNING = 0.1
+DRIFT_PSI_ALERT = 0.25
+DRIFT_KS_ALERT = 0.1
+DRIFT_LOG_LEVEL = 'INFO'        # level logger 'drift', terpisah dari level root (main.py memakai ERROR)
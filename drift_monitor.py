@@ -0,0 +1,343 @@
+# Monitoring drift input produksi terhadap distribusi data latih
+# Setiap input yang diprediksi dicatat ke sketch per fitur berukuran tetap (jumlah per bin), lalu
+# dibandingkan dengan baseline data latih memakai PSI dan KS tanpa membaca ulang riwayat
+import os #mengecek file baseline
+import json #format baseline
+import logging #mencatat alert drift
+import tempfile #file sementara untuk penulisan atomik
+import argparse #argumen command line
+import threading #mengamankan sketch dari sesi yang berjalan bersamaan
+from bisect import bisect_right #mencari bin untuk satu input
+import numpy as np #komputasi histogram
+from metrics import increment #penghitung alert
+from config import (FEATURE_COLUMNS, MODEL_DIR, DRIFT_TRAINING_DATA, DRIFT_BASELINE_PATH, DRIFT_BINS, DRIFT_WINDOW,
+                    DRIFT_MIN_OBSERVATIONS, DRIFT_CHECK_INTERVAL, DRIFT_PSI_WARNING, DRIFT_PSI_ALERT, DRIFT_KS_ALERT,
+                    DRIFT_LOG_LEVEL)
+
+# Fitur numerik memakai bin kuantil data latih, fitur kategori memakai satu bin per kode
+CATEGORY_CODES = {'gender': 2, 'hypertension': 2, 'heart_disease': 2, 'smoking_history': 6}
+PSI_EPSILON = 1e-4  # proporsi minimum agar bin kosong tidak membuat PSI tak hingga
+STATUS_LEVELS = ['ok', 'warning', 'alert']
+
+# Data untuk check_baseline: (file, fitur yang harus berstatus ok)
+# Data uji sudah ter-encode dengan kode data latih, semua fitur harus sesuai dengan baseline.
+# Dataset mentah berisi teks kategori yang di-encode seperti input aplikasi; fitur angka tidak dicek
+# karena data latih sudah diseimbangkan sehingga distribusinya memang berbeda dengan data mentah
+BASELINE_CHECKS = [
+    ('dataset/test_data_before_scaling.csv', FEATURE_COLUMNS),
+    ('dataset/diabetes.csv', list(CATEGORY_CODES)),
+]
+
+# Logger sendiri agar alert tetap tercatat di app.log walaupun level root logger ERROR
+_logger = logging.getLogger('drift')
+_logger.setLevel(DRIFT_LOG_LEVEL)
+
+# Function to compute the bin edges of one feature from training values
+def bin_edges(feature, values, bins=DRIFT_BINS):
+    if feature in CATEGORY_CODES:
+        # Kode 0..k-1, batas di tengah antar kode
+        return [code + 0.5 for code in range(CATEGORY_CODES[feature] - 1)]
+    quantiles = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+    return [float(edge) for edge in np.unique(quantiles)]
+
+# Function to count values per bin (nilai yang sama dengan batas masuk ke bin di atasnya)
+def bin_counts(edges, values):
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+
+# Function to build the training baseline (fitur -> batas bin dan proporsi per bin)
+# features: array 2D dengan urutan FEATURE_COLUMNS
+def build_baseline(features, bins=DRIFT_BINS):
+    features = np.asarray(features, dtype=np.float64)
+    features = features[~np.isnan(features).any(axis=1)]
+    baseline = {}
+    for index, feature in enumerate(FEATURE_COLUMNS):
+        edges = bin_edges(feature, features[:, index], bins)
+        counts = bin_counts(edges, features[:, index])
+        baseline[feature] = {
+            'kind': 'category' if feature in CATEGORY_CODES else 'numeric',
+            'edges': edges,
+            'proportions': (counts / counts.sum()).tolist(),
+            'mean': float(features[:, index].mean()),
+        }
+    return {'rows': len(features), 'features': baseline}
+
+# Function to write a baseline file (ditulis ke file sementara lalu rename)
+def save_baseline(baseline, path=DRIFT_BASELINE_PATH):
+    # Nama file sementara unik di folder yang sama, agar proses lain yang menulis bersamaan tidak bertabrakan
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(baseline, file, indent=2)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return path
+
+# Function to load the training baseline, dibuat dari DRIFT_TRAINING_DATA jika belum ada
+def load_baseline(path=DRIFT_BASELINE_PATH):
+    if not os.path.exists(path):
+        from columnar_store import read_dataset #data latih dari salinan Parquet
+        data = read_dataset(DRIFT_TRAINING_DATA, columns=FEATURE_COLUMNS)
+        save_baseline(build_baseline(data.to_numpy(dtype=np.float64)), path)
+        logging.info(f"Built drift baseline from {DRIFT_TRAINING_DATA}")
+    with open(path) as file:
+        return json.load(file)
+
+# Function to compute the population stability index of two bin proportions
+def psi(expected, actual):
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), PSI_EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+# Function to compute the Kolmogorov-Smirnov statistic from bin proportions
+# Dihitung di batas bin, sehingga nilainya batas bawah dari KS data mentah
+def ks_statistic(expected, actual):
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+# Sketch satu fitur: jumlah per bin untuk jendela aktif dan jendela sebelumnya
+# Memori tetap (2 x jumlah bin), perbandingan selalu memakai antara window dan 2 x window input terakhir
+# Jumlah per bin disimpan sebagai list biasa karena menambah satu elemen list jauh lebih cepat dari array NumPy
+class FeatureSketch:
+    def __init__(self, edges, window=DRIFT_WINDOW):
+        self.edges = list(edges)
+        self.window = window
+        self.current = [0] * (len(self.edges) + 1)
+        self.previous = [0] * (len(self.edges) + 1)
+        self.current_size = 0
+        self.total = 0
+        self.sum = 0.0
+
+    def _rotate(self):
+        if self.current_size >= self.window:
+            self.previous = self.current
+            self.current = [0] * len(self.previous)
+            self.current_size = 0
+
+    def add(self, value):
+        self.current[bisect_right(self.edges, value)] += 1
+        self.current_size += 1
+        self.total += 1
+        self.sum += value
+        self._rotate()
+
+    # Input dipecah per sisa jendela (rotasi di antaranya), sehingga satu upload besar tidak menjadi satu
+    # jendela raksasa yang mengalahkan input tunggal berikutnya
+    def add_many(self, values):
+        self.total += len(values)
+        self.sum += float(np.sum(values))
+        start = 0
+        while start < len(values):
+            end = start + self.window - self.current_size
+            if self.current_size == 0:
+                # Jendela penuh yang akan tergeser seluruhnya oleh jendela berikutnya dilewati
+                end += max((len(values) - start) // self.window - 1, 0) * self.window
+                start = end - self.window
+            piece = values[start:end]
+            self.current = [count + added for count, added in zip(self.current, bin_counts(self.edges, piece).tolist())]
+            self.current_size += len(piece)
+            start = end
+            self._rotate()
+
+    # Function to get the bin counts of the recent window
+    def counts(self):
+        return np.add(self.current, self.previous)
+
+# Monitor drift untuk semua fitur input model
+class DriftMonitor:
+    def __init__(self, baseline, window=DRIFT_WINDOW, min_observations=DRIFT_MIN_OBSERVATIONS,
+                 check_interval=DRIFT_CHECK_INTERVAL):
+        self.baseline = baseline['features']
+        self.min_observations = min_observations
+        self.check_interval = check_interval
+        self.sketches = {feature: FeatureSketch(self.baseline[feature]['edges'], window)
+                         for feature in FEATURE_COLUMNS}
+        self._ordered = [self.sketches[feature] for feature in FEATURE_COLUMNS]  # urutan FEATURE_COLUMNS
+        self._lock = threading.Lock()
+        self._observations = 0
+        self._status = {feature: 'ok' for feature in FEATURE_COLUMNS}
+
+    # Function to record one model input vector (urutan FEATURE_COLUMNS)
+    def observe(self, input_data):
+        with self._lock:
+            for sketch, value in zip(self._ordered, input_data):
+                sketch.add(float(value))
+            self._observations += 1
+            due = self._observations % self.check_interval == 0
+        if due:
+            self.check()
+
+    # Function to record many validated model input rows at once
+    def observe_batch(self, features):
+        if len(features) == 0:
+            return
+        with self._lock:
+            for index, feature in enumerate(FEATURE_COLUMNS):
+                self.sketches[feature].add_many(features[:, index])
+            before = self._observations
+            self._observations += len(features)
+            due = self._observations // self.check_interval > before // self.check_interval
+        if due:
+            self.check()
+
+    # Function to compare the recent window of every feature with the baseline
+    def report(self):
+        with self._lock:
+            snapshot = {feature: (sketch.counts(), sketch.total, sketch.sum) for feature, sketch in self.sketches.items()}
+        rows = []
+        for feature in FEATURE_COLUMNS:
+            counts, total, value_sum = snapshot[feature]
+            baseline = self.baseline[feature]
+            window = int(counts.sum())
+            row = {
+                'feature': feature,
+                'kind': baseline['kind'],
+                'observations': total,
+                'window': window,
+                'baseline_mean': baseline['mean'],
+                'mean': value_sum / total if total else None,
+                'psi': None,
+                'ks': None,
+                'status': 'ok',
+            }
+            if window:
+                actual = counts / window
+                row['psi'] = psi(baseline['proportions'], actual)
+                if baseline['kind'] == 'numeric':
+                    row['ks'] = ks_statistic(baseline['proportions'], actual)
+            if window >= self.min_observations:
+                if row['psi'] >= DRIFT_PSI_ALERT or (row['ks'] or 0) >= DRIFT_KS_ALERT:
+                    row['status'] = 'alert'
+                elif row['psi'] >= DRIFT_PSI_WARNING:
+                    row['status'] = 'warning'
+            rows.append(row)
+        return rows
+
+    # Function to check drift and raise an alert when a feature changes status (dicatat sekali per perubahan)
+    def check(self):
+        rows = self.report()
+        for row in rows:
+            feature, status = row['feature'], row['status']
+            with self._lock:
+                previous, self._status[feature] = self._status[feature], status
+            if status == previous:
+                continue
+            if STATUS_LEVELS.index(status) > STATUS_LEVELS.index(previous):
+                increment('drift_alerts_total', feature=feature, status=status)
+                ks = f"{row['ks']:.3f}" if row['ks'] is not None else '-'
+                _logger.warning(f"Input drift {status} for {feature}: psi={row['psi']:.3f} ks={ks}")
+            else:
+                _logger.info(f"Input drift for {feature} back to {status}")
+        return rows
+
+    # Function to get the recent bin proportions of one feature next to the baseline (untuk grafik dashboard)
+    def distribution(self, feature):
+        with self._lock:
+            counts = self.sketches[feature].counts()
+        baseline = self.baseline[feature]
+        edges = baseline['edges']
+        if baseline['kind'] == 'category':
+            bins = [str(code) for code in range(len(edges) + 1)]
+        else:
+            bounds = ['-∞'] + [f'{edge:g}' for edge in edges] + ['∞']
+            bins = [f'{low} - {high}' for low, high in zip(bounds, bounds[1:])]
+        window = counts.sum()
+        return {
+            'bins': bins,
+            'baseline': baseline['proportions'],
+            'current': (counts / window).tolist() if window else [0.0] * len(bins),
+        }
+
+    def reset(self):
+        with self._lock:
+            for sketch in self.sketches.values():
+                sketch.current = [0] * len(sketch.current)
+                sketch.previous = [0] * len(sketch.previous)
+                sketch.current_size = 0
+                sketch.total = 0
+                sketch.sum = 0.0
+            self._observations = 0
+            self._status = {feature: 'ok' for feature in FEATURE_COLUMNS}
+
+# Function to check the baseline against the test data and the app encoding (daftar fitur yang tidak ok)
+# Baseline yang memakai kode berbeda dengan input aplikasi langsung terlihat sebagai alert di sini
+def check_baseline(baseline=None, checks=BASELINE_CHECKS):
+    from columnar_store import read_dataset #data uji dari salinan Parquet
+    from prediction import encode_features, validate_batch #encoding dan validasi yang sama dengan prediksi massal
+    baseline = baseline or load_baseline()
+    failures = []
+    for path, features in checks:
+        encoded = encode_features(read_dataset(path, columns=FEATURE_COLUMNS))
+        valid, _ = validate_batch(encoded)
+        # Seluruh file dinilai sebagai satu jendela
+        monitor = DriftMonitor(baseline, window=max(int(valid.sum()), 1), min_observations=1)
+        monitor.observe_batch(encoded[valid])
+        failures.extend(dict(row, data=path) for row in monitor.report()
+                        if row['feature'] in features and row['status'] != 'ok')
+    return failures
+
+_monitor = None
+_monitor_lock = threading.Lock()
+_disabled = False
+
+# Function to get the process-wide drift monitor (None jika baseline tidak dapat dimuat)
+def get_monitor():
+    global _monitor, _disabled
+    if _monitor is None and not _disabled:
+        with _monitor_lock:
+            if _monitor is None and not _disabled:
+                try:
+                    _monitor = DriftMonitor(load_baseline())
+                except Exception as e:
+                    # Monitoring tidak boleh menggagalkan prediksi
+                    _disabled = True
+                    logging.error(f"Drift monitoring disabled: {str(e)}")
+    return _monitor
+
+# Function to record one served model input (dipanggil dari jalur prediksi)
+def observe_input(input_data):
+    monitor = get_monitor()
+    if monitor is not None:
+        monitor.observe(input_data)
+
+# Function to record many served model input rows (dipanggil dari jalur prediksi)
+def observe_features(features):
+    monitor = get_monitor()
+    if monitor is not None:
+        monitor.observe_batch(features)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Baseline dan laporan drift input model terhadap data latih")
+    parser.add_argument('--build-baseline', action='store_true', help=f"buat ulang baseline dari {DRIFT_TRAINING_DATA}")
+    parser.add_argument('--report', metavar='PATH', help="bandingkan file CSV/Parquet berisi input dengan baseline")
+    parser.add_argument('--check', action='store_true', help="cek baseline dengan data uji, keluar dengan kode 1 jika tidak sesuai")
+    args = parser.parse_args()
+
+    if args.build_baseline and os.path.exists(DRIFT_BASELINE_PATH):
+        os.remove(DRIFT_BASELINE_PATH)
+    baseline = load_baseline()
+    print(f"Baseline: {DRIFT_BASELINE_PATH} ({baseline['rows']} rows, model dir {MODEL_DIR})")
+
+    if args.report:
+        from columnar_store import read_dataset #input dari file
+        from prediction import encode_features, validate_batch #encoding dan validasi yang sama dengan prediksi massal
+        features = encode_features(read_dataset(args.report, columns=FEATURE_COLUMNS))
+        valid, _ = validate_batch(features)
+        # Seluruh file dinilai sebagai satu jendela
+        monitor = DriftMonitor(baseline, window=max(int(valid.sum()), 1), min_observations=1)
+        monitor.observe_batch(features[valid])
+        print(f"{'feature':<20} {'window':>7} {'psi':>7} {'ks':>7} {'mean':>9} {'baseline':>9}  status")
+        for row in monitor.report():
+            ks = f"{row['ks']:.3f}" if row['ks'] is not None else '-'
+            psi_value = f"{row['psi']:.3f}" if row['psi'] is not None else '-'
+            mean = f"{row['mean']:.2f}" if row['mean'] is not None else '-'
+            print(f"{row['feature']:<20} {row['window']:>7} {psi_value:>7} {ks:>7} {mean:>9} "
+                  f"{row['baseline_mean']:>9.2f}  {row['status']}")
+
+    if args.check:
+        failures = check_baseline(baseline)
+        for row in failures:
+            print(f"{row['data']}: {row['feature']} {row['status']} (psi={row['psi']:.3f})")
+        print(f"Baseline check: {len(failures)} features out of range")
+        if failures:
+            raise SystemExit(1)
@@ -0,0 +1,124 @@
+# Encoding fitur kategori yang sama untuk input menu Prediksi, prediksi massal, riwayat dan training
+# Kode model diambil dari tabel di config.py (kode yang benar-benar dipakai pada data latih model),
+# bukan dari urutan kelas LabelEncoder di ENCODER.sav
+import sys #kode keluar jika pengecekan encoding gagal
+import argparse #argumen command line
+import numpy as np #tabel kode -> label
+import pandas as pd #lookup label untuk banyak nilai sekaligus
+from config import (FEATURE_COLUMNS, GENDER_LABELS, GENDER_CODES, YES_NO_LABELS,
+                    SMOKING_HISTORY_LABELS, SMOKING_HISTORY_CODES)
+
+# Dataset mentah dan dataset ter-encode yang dipakai untuk melatih model (dipakai oleh check_encoding)
+RAW_DATA = 'dataset/diabetes.csv'
+ENCODED_DATA = 'dataset/dataset_seimbang.csv'
+
+# Encoder dua arah untuk satu fitur kategori
+# labels: kode model -> label tampilan (list = kode sesuai urutan), aliases: nama lain -> kode (mis. kelas dataset asli)
+# encode menerima label tampilan, alias, atau kode (angka/teks)
+class CategoryEncoder:
+    def __init__(self, labels, aliases=None):
+        if not isinstance(labels, dict):
+            labels = dict(enumerate(labels))
+        self.codes = sorted(labels)
+        # Tabel kode -> label, kode yang tidak dipakai model bernilai None
+        self.labels = np.full(max(self.codes) + 1, None, dtype=object)
+        self.labels[self.codes] = [labels[code] for code in self.codes]
+        lookup = {}
+        for code in self.codes:
+            lookup.setdefault(labels[code], code)
+        for name, code in (aliases or {}).items():
+            lookup.setdefault(name, code)
+        for code in self.codes:
+            lookup.setdefault(code, code)
+            lookup.setdefault(str(code), code)
+        self._lookup = lookup
+        self._keys = pd.Index(list(lookup), dtype=object)
+        self._codes = np.append(np.fromiter(lookup.values(), dtype=np.float64, count=len(lookup)), np.nan)
+
+    # Function to encode one value, None jika bukan kategori yang dikenal
+    def encode_one(self, value):
+        try:
+            return self._lookup.get(value)
+        except TypeError:
+            return None
+
+    # Function to encode many values at once (NaN untuk nilai yang tidak dikenal)
+    def encode(self, values):
+        # get_indexer mengembalikan -1 untuk nilai yang tidak dikenal, yang menunjuk ke NaN di akhir tabel
+        return self._codes[self._keys.get_indexer(np.asarray(values, dtype=object))]
+
+    # Function to decode one model code into its display label (None jika kode tidak valid)
+    def decode_one(self, code):
+        try:
+            code = int(code)
+        except (TypeError, ValueError):
+            return None
+        return self.labels[code] if 0 <= code < len(self.labels) else None
+
+    # Function to decode many model codes at once (None untuk kode yang tidak valid)
+    def decode(self, codes):
+        codes = pd.to_numeric(np.asarray(codes).ravel(), errors='coerce').astype(np.float64)
+        valid = (codes >= 0) & (codes < len(self.labels)) & (codes == np.floor(codes))
+        labels = np.full(len(codes), None, dtype=object)
+        labels[valid] = self.labels[codes[valid].astype(np.intp)]
+        return labels
+
+# Function to build the encoder of every categorical feature from the code tables in config.py
+def build_encoders():
+    return {
+        'gender': CategoryEncoder(GENDER_LABELS, GENDER_CODES),
+        'hypertension': CategoryEncoder(YES_NO_LABELS),
+        'heart_disease': CategoryEncoder(YES_NO_LABELS),
+        'smoking_history': CategoryEncoder(SMOKING_HISTORY_LABELS, SMOKING_HISTORY_CODES),
+    }
+
+_encoders = None
+
+# Function to get the shared encoders (disusun sekali per proses, tanpa membaca file)
+def get_encoders():
+    global _encoders
+    if _encoders is None:
+        _encoders = build_encoders()
+    return _encoders
+
+# Function to decode a model code of one feature into its display label (dipakai oleh riwayat dan rekomendasi)
+def decode_code(column, code):
+    return get_encoders()[column].decode_one(code)
+
+# Function to check the encoders against the encoded dataset the model was trained on
+# Baris mentah dipasangkan dengan baris ter-encode lewat kolom angka (hanya kombinasi yang unik di kedua file),
+# lalu untuk setiap kelas, kode yang paling sering muncul di data ter-encode harus sama dengan kode encoder
+# Hasil: daftar selisih, kosong jika encoding sesuai
+def check_encoding(raw_path=RAW_DATA, encoded_path=ENCODED_DATA):
+    encoders = get_encoders()
+    keys = [column for column in FEATURE_COLUMNS if column not in encoders] + ['diabetes']
+    raw, encoded = pd.read_csv(raw_path), pd.read_csv(encoded_path)
+    for data in (raw, encoded):
+        data[keys] = data[keys].astype(np.float64)
+    pairs = raw.drop_duplicates(keys, keep=False).merge(
+        encoded.drop_duplicates(keys, keep=False), on=keys, suffixes=('_raw', '_encoded'))
+
+    mismatches = []
+    for column, encoder in encoders.items():
+        for value, codes in pairs.groupby(f'{column}_raw')[f'{column}_encoded']:
+            expected = encoder.encode_one(value)
+            observed = int(codes.mode()[0])
+            # Kelas yang tidak dikenal encoder (mis. gender Other) dibuang saat training
+            if expected is not None and expected != observed:
+                mismatches.append({'feature': column, 'value': value, 'code': expected,
+                                   'training_code': observed, 'rows': len(codes)})
+    return mismatches
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cek kode kategori encoder terhadap dataset ter-encode yang dipakai training")
+    parser.add_argument('--raw', default=RAW_DATA)
+    parser.add_argument('--encoded', default=ENCODED_DATA)
+    args = parser.parse_args()
+
+    mismatches = check_encoding(args.raw, args.encoded)
+    for mismatch in mismatches:
+        print(f"{mismatch['feature']}={mismatch['value']!r}: code {mismatch['code']}, "
+              f"training data uses {mismatch['training_code']} ({mismatch['rows']} rows)")
+    print(f"Encoding check: {len(mismatches)} mismatches")
+    if mismatches:
+        sys.exit(1)
@@ -0,0 +1,424 @@
+import os #mengelola file riwayat
+import sqlite3 #database riwayat default
+import logging #mencatat aktivitas penyimpanan
+import threading #mengamankan buffer dan koneksi dari sesi yang berjalan bersamaan
+import atexit #menulis sisa buffer saat proses berhenti
+import time #batas waktu flush antrian
+import queue #antrian write-behind
+from bisect import bisect_right #mencari kelompok usia/BMI
+from collections import Counter #menghitung perubahan agregat
+from datetime import datetime #waktu prediksi
+import pandas as pd #analisis data
+from metrics import span, increment #pengukuran waktu penulisan dan penghitung
+from config import (HISTORY_BACKEND, HISTORY_DB, HISTORY_FILE, HISTORY_BUFFER_SIZE, HISTORY_WRITE_BEHIND,
+                    HISTORY_FLUSH_INTERVAL, HISTORY_QUEUE_SIZE, HISTORY_QUEUE_TIMEOUT, AGE_BANDS, BMI_BANDS)
+
+# Kolom riwayat: (nama kolom tampilan, nama kolom database, tipe SQLite)
+HISTORY_SCHEMA = [
+    ('Waktu', 'timestamp', 'TEXT NOT NULL'),
+    ('Nama', 'name', 'TEXT COLLATE NOCASE'),
+    ('Jenis Kelamin', 'gender', 'TEXT'),
+    ('Usia', 'age', 'REAL'),
+    ('Hipertensi', 'hypertension', 'TEXT'),
+    ('Penyakit Jantung', 'heart_disease', 'TEXT'),
+    ('Riwayat Merokok', 'smoking_history', 'TEXT'),
+    ('BMI', 'bmi', 'REAL'),
+    ('Level HbA1c', 'hba1c_level', 'REAL'),
+    ('Glukosa Darah', 'blood_glucose_level', 'REAL'),
+    ('Hasil', 'result', 'TEXT'),
+]
+HISTORY_COLUMNS = [display for display, _, _ in HISTORY_SCHEMA]
+DB_COLUMNS = [column for _, column, _ in HISTORY_SCHEMA]
+
+# Dimensi agregat riwayat yang diperbarui setiap kali prediksi disimpan
+AGGREGATE_DIMENSIONS = ['total', 'gender', 'age_band', 'bmi_band', 'day']
+AGGREGATE_COLUMNS = ['bucket', 'result', 'count']
+UNKNOWN_BUCKET = 'Tidak Diketahui'
+
+# Function to find the band label of a value (AGE_BANDS / BMI_BANDS)
+def _band(value, bands):
+    if value is None or pd.isna(value):
+        return UNKNOWN_BUCKET
+    index = bisect_right([low for low, _ in bands], float(value)) - 1
+    return bands[index][1] if index >= 0 else UNKNOWN_BUCKET
+
+def age_band(age):
+    return _band(age, AGE_BANDS)
+
+def bmi_band(bmi):
+    return _band(bmi, BMI_BANDS)
+
+# Function to compute aggregate increments for a list of records
+def aggregate_deltas(records):
+    deltas = Counter()
+    for record in records:
+        result = record.get('Hasil') or UNKNOWN_BUCKET
+        gender = record.get('Jenis Kelamin')
+        timestamp = record.get('Waktu')
+        deltas[('total', 'Semua', result)] += 1
+        deltas[('gender', gender if isinstance(gender, str) else UNKNOWN_BUCKET, result)] += 1
+        deltas[('age_band', age_band(record.get('Usia')), result)] += 1
+        deltas[('bmi_band', bmi_band(record.get('BMI')), result)] += 1
+        deltas[('day', timestamp[:10] if isinstance(timestamp, str) else UNKNOWN_BUCKET, result)] += 1
+    return deltas
+
+# Function to fill the timestamp of records that do not have one yet
+def _with_timestamp(records):
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return [{**record, 'Waktu': record.get('Waktu') or now} for record in records]
+
+# Interface untuk semua backend riwayat
+class HistoryStore:
+    # Function to add records (list of dict dengan kunci HISTORY_COLUMNS)
+    def append(self, records):
+        raise NotImplementedError
+
+    # Function to write buffered records to storage
+    def flush(self):
+        pass
+
+    # Function to read one page of history, data terbaru lebih dulu
+    def query(self, name=None, result=None, start=None, end=None, limit=None, offset=0):
+        raise NotImplementedError
+
+    # Function to count history rows matching the filter
+    def count(self, name=None, result=None, start=None, end=None):
+        raise NotImplementedError
+
+    # Function to read running aggregates of one dimension (kolom: bucket, result, count)
+    def aggregates(self, dimension):
+        raise NotImplementedError
+
+    # Function to get a version stamp that changes whenever history is written (untuk cache tampilan)
+    def version(self):
+        raise NotImplementedError
+
+# Backend SQLite: mode WAL, index untuk filter, dan penulisan dalam batch
+class SQLiteHistoryStore(HistoryStore):
+    def __init__(self, path=HISTORY_DB, buffer_size=HISTORY_BUFFER_SIZE, legacy_csv=HISTORY_FILE):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._create_schema()
+        if self._needs_aggregate_rebuild():
+            self.rebuild_aggregates()
+        if legacy_csv and os.path.exists(legacy_csv) and self.count() == 0:
+            self.import_csv(legacy_csv)
+
+    # Satu koneksi per thread, karena objek koneksi sqlite3 tidak boleh dipakai lintas thread
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        columns = ', '.join(f'{column} {sql_type}' for _, column, sql_type in HISTORY_SCHEMA)
+        with self._connection() as connection:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS prediction_history (id INTEGER PRIMARY KEY, {columns})')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_history_name ON prediction_history (name)')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_history_result ON prediction_history (result)')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_history_timestamp ON prediction_history (timestamp)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS history_aggregates ('
+                'dimension TEXT NOT NULL, bucket TEXT NOT NULL, result TEXT NOT NULL, count INTEGER NOT NULL, '
+                'PRIMARY KEY (dimension, bucket, result))'
+            )
+
+    def _upsert_aggregates(self, connection, deltas):
+        connection.executemany(
+            'INSERT INTO history_aggregates (dimension, bucket, result, count) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (dimension, bucket, result) DO UPDATE SET count = count + excluded.count',
+            [(dimension, bucket, result, count) for (dimension, bucket, result), count in deltas.items()]
+        )
+
+    def _insert(self, records):
+        placeholders = ', '.join('?' for _ in DB_COLUMNS)
+        rows = [tuple(record.get(column) for column in HISTORY_COLUMNS) for record in records]
+        # Data dan agregat ditulis dalam satu transaksi agar selalu konsisten
+        with span('history_write'), self._connection() as connection:
+            connection.executemany(
+                f'INSERT INTO prediction_history ({", ".join(DB_COLUMNS)}) VALUES ({placeholders})', rows
+            )
+            self._upsert_aggregates(connection, aggregate_deltas(records))
+
+    def _needs_aggregate_rebuild(self):
+        connection = self._connection()
+        has_rows = connection.execute('SELECT 1 FROM prediction_history LIMIT 1').fetchone() is not None
+        has_aggregates = connection.execute('SELECT 1 FROM history_aggregates LIMIT 1').fetchone() is not None
+        return has_rows and not has_aggregates
+
+    # Function to rebuild all aggregates from the stored rows (hanya untuk database lama)
+    def rebuild_aggregates(self, chunksize=100000):
+        columns = ['Waktu', 'Jenis Kelamin', 'Usia', 'BMI', 'Hasil']
+        db_columns = [DB_COLUMNS[HISTORY_COLUMNS.index(column)] for column in columns]
+        deltas = Counter()
+        cursor = self._connection().execute(f'SELECT {", ".join(db_columns)} FROM prediction_history')
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            deltas.update(aggregate_deltas([dict(zip(columns, row)) for row in rows]))
+        with self._connection() as connection:
+            connection.execute('DELETE FROM history_aggregates')
+            self._upsert_aggregates(connection, deltas)
+        logging.info("Rebuilt history aggregates")
+
+    def append(self, records):
+        records = _with_timestamp(records)
+        with self._lock:
+            self._buffer.extend(records)
+            if len(self._buffer) < self.buffer_size:
+                return
+            pending, self._buffer = self._buffer, []
+        self._insert(pending)
+
+    def flush(self):
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if pending:
+            self._insert(pending)
+
+    # Function to import an old CSV history file in chunks
+    def import_csv(self, path, chunksize=50000):
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk = chunk.reindex(columns=HISTORY_COLUMNS).astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            self._insert(_with_timestamp(chunk.to_dict('records')))
+        logging.info(f"Imported legacy history from {path}")
+
+    def _where(self, name, result, start, end):
+        clauses, params = [], []
+        if name:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(escaped + '%')
+        if result:
+            clauses.append('result = ?')
+            params.append(result)
+        if start:
+            clauses.append('timestamp >= ?')
+            params.append(str(start))
+        if end:
+            clauses.append('timestamp < ?')
+            params.append(str(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def query(self, name=None, result=None, start=None, end=None, limit=None, offset=0):
+        self.flush()
+        where, params = self._where(name, result, start, end)
+        sql = f'SELECT {", ".join(DB_COLUMNS)} FROM prediction_history {where} ORDER BY id DESC'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        rows = self._connection().execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+
+    def count(self, name=None, result=None, start=None, end=None):
+        self.flush()
+        if not (name or start or end):
+            # Tanpa filter nama/waktu, jumlah diambil dari agregat tanpa memindai tabel
+            sql = "SELECT COALESCE(SUM(count), 0) FROM history_aggregates WHERE dimension = 'total'"
+            params = []
+            if result:
+                sql += ' AND result = ?'
+                params.append(result)
+            return self._connection().execute(sql, params).fetchone()[0]
+        where, params = self._where(name, result, start, end)
+        return self._connection().execute(f'SELECT COUNT(*) FROM prediction_history {where}', params).fetchone()[0]
+
+    def version(self):
+        self.flush()
+        # id hanya bertambah (riwayat tidak pernah diubah atau dihapus oleh aplikasi)
+        return self._connection().execute('SELECT COALESCE(MAX(id), 0) FROM prediction_history').fetchone()[0]
+
+    def aggregates(self, dimension):
+        self.flush()
+        rows = self._connection().execute(
+            'SELECT bucket, result, count FROM history_aggregates WHERE dimension = ? ORDER BY bucket, result',
+            [dimension]
+        ).fetchall()
+        return pd.DataFrame(rows, columns=AGGREGATE_COLUMNS)
+
+# Backend CSV (format lama), membaca seluruh file pada setiap query
+class CSVHistoryStore(HistoryStore):
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, records):
+        data = pd.DataFrame(_with_timestamp(records))
+        with span('history_write'), self._lock:
+            if os.path.exists(self.path):
+                # Ikuti urutan kolom file yang sudah ada
+                columns = pd.read_csv(self.path, nrows=0).columns
+                data.reindex(columns=columns).to_csv(self.path, mode='a', header=False, index=False)
+            else:
+                data.reindex(columns=HISTORY_COLUMNS).to_csv(self.path, mode='w', header=True, index=False)
+
+    def _load(self, name, result, start, end):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        history = pd.read_csv(self.path).reindex(columns=HISTORY_COLUMNS)
+        mask = pd.Series(True, index=history.index)
+        if name:
+            mask &= history['Nama'].astype(str).str.lower().str.startswith(name.lower())
+        if result:
+            mask &= history['Hasil'] == result
+        if start:
+            mask &= history['Waktu'] >= str(start)
+        if end:
+            mask &= history['Waktu'] < str(end)
+        return history[mask]
+
+    def query(self, name=None, result=None, start=None, end=None, limit=None, offset=0):
+        history = self._load(name, result, start, end).iloc[::-1]
+        if limit is not None:
+            history = history.iloc[offset:offset + limit]
+        return history.reset_index(drop=True)
+
+    def count(self, name=None, result=None, start=None, end=None):
+        return len(self._load(name, result, start, end))
+
+    def aggregates(self, dimension):
+        # Format CSV tidak menyimpan agregat, sehingga dihitung ulang dari seluruh file
+        history = self._load(None, None, None, None)
+        deltas = aggregate_deltas(history.to_dict('records'))
+        rows = [(bucket, result, count) for (dim, bucket, result), count in sorted(deltas.items()) if dim == dimension]
+        return pd.DataFrame(rows, columns=AGGREGATE_COLUMNS)
+
+    def version(self):
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+# Write-behind: append hanya memasukkan record ke antrian, thread background menulisnya ke backend
+# dalam batch (setiap batch_size record atau setiap flush_interval detik)
+# Jika antrian penuh, append menunggu paling lama put_timeout detik (backpressure) lalu raise queue.Full
+class WriteBehindHistoryStore(HistoryStore):
+    def __init__(self, store, batch_size=HISTORY_BUFFER_SIZE, flush_interval=HISTORY_FLUSH_INTERVAL,
+                 max_queue=HISTORY_QUEUE_SIZE, put_timeout=HISTORY_QUEUE_TIMEOUT):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        # Satu item = satu record, None = tanda berhenti, threading.Event = permintaan flush
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._writer.start()
+
+    def append(self, records):
+        if self._closed:
+            raise RuntimeError("History store sudah ditutup")
+        deadline = time.monotonic() + self.put_timeout
+        for record in _with_timestamp(records):
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                increment('history_queue_full_total')
+                self._queue.put(record, timeout=max(deadline - time.monotonic(), 0))
+
+    # Function to collect one batch from the queue (menunggu sampai batch penuh atau batas waktu habis)
+    # Tanda berhenti atau permintaan flush langsung menutup batch tanpa menunggu batas waktu
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while isinstance(batch[-1], dict) and len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            records = [record for record in batch if isinstance(record, dict)]
+            try:
+                if records:
+                    self.store.append(records)
+                    self.store.flush()
+                    increment('history_records_written_total', len(records))
+            except Exception as e:
+                increment('history_write_errors_total')
+                logging.error(f"Error writing history batch of {len(records)} records: {str(e)}")
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    # Function to wait until every record queued before this call has been written
+    # Permintaan flush masuk antrian di belakang record tersebut, sehingga batch ditulis tanpa menunggu flush_interval
+    def flush(self):
+        if not self._writer.is_alive() or not self._queue.unfinished_tasks:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(self.flush_interval):
+            # Writer sudah berhenti (close dari thread lain), sisa record sudah ditulis oleh close
+            if not self._writer.is_alive():
+                return
+
+    # Function to stop the writer thread after writing the remaining records (dipanggil saat proses berhenti)
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self.store.flush()
+
+    def queue_size(self):
+        return self._queue.qsize()
+
+    def query(self, name=None, result=None, start=None, end=None, limit=None, offset=0):
+        self.flush()
+        return self.store.query(name=name, result=result, start=start, end=end, limit=limit, offset=offset)
+
+    def count(self, name=None, result=None, start=None, end=None):
+        self.flush()
+        return self.store.count(name=name, result=result, start=start, end=end)
+
+    def aggregates(self, dimension):
+        self.flush()
+        return self.store.aggregates(dimension)
+
+    def version(self):
+        self.flush()
+        return self.store.version()
+
+HISTORY_BACKENDS = {
+    'sqlite': SQLiteHistoryStore,
+    'csv': CSVHistoryStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+# Function to get the process-wide history store (backend dipilih lewat config HISTORY_BACKEND)
+def get_history_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = HISTORY_BACKENDS[HISTORY_BACKEND]()
+                if HISTORY_WRITE_BEHIND:
+                    store = WriteBehindHistoryStore(store)
+                    atexit.register(store.close)
+                else:
+                    atexit.register(store.flush)
+                _store = store
+    return _store
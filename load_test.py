@@ -0,0 +1,284 @@
+# Load test untuk alur menu Prediksi dengan banyak sesi pengguna bersamaan
+# Setiap sesi simulasi adalah satu thread yang mengirim input realistis dari dataset uji, lalu
+# throughput, latensi (p50/p95/p99) dan pertumbuhan memori per sesi dilaporkan untuk setiap tingkat konkurensi
+# Mode inprocess memanggil fungsi yang sama dengan handler tombol Prediksi, mode apptest menjalankan
+# main.py lewat Streamlit AppTest (termasuk rerun script dan widget, jauh lebih berat)
+import os #mengelola file sementara
+import sys #kode keluar jika melewati batas latensi
+import json #format laporan
+import time #mengukur latensi
+import argparse #argumen command line
+import platform #informasi lingkungan pengujian
+import tempfile #database riwayat sementara
+import threading #sesi simulasi bersamaan
+import numpy as np #statistik latensi
+import history_store #history store proses yang diganti sementara selama load test
+from history_store import SQLiteHistoryStore, WriteBehindHistoryStore #riwayat ditulis ke database sementara
+from columnar_store import read_dataset #dataset uji dari salinan Parquet
+from feature_encoding import get_encoders #kode kategori -> label form
+from prediction import validate_batch #hanya input yang lolos validasi form
+from result_cache import prediction_cache #cache hasil dikosongkan di awal setiap tingkat
+from config import FEATURE_COLUMNS, SMOKING_HISTORY_OPTIONS
+
+TEST_DATA = 'dataset/test_data_before_scaling.csv'
+SESSION_LEVELS = [1, 4, 16]
+# Riwayat merokok yang tidak ada di form -> pilihan yang diisi pengguna tersebut
+# (tanpa info: pilihan pertama/bawaan form, sudah tidak merokok: mantan perokok)
+FORM_SMOKING_CHOICES = {'Tidak Ada Info': SMOKING_HISTORY_OPTIONS[0], 'Sudah Tidak Merokok': 'Mantan Perokok'}
+SUMMARY_COLUMNS = {'age': 'Usia', 'bmi': 'BMI', 'HbA1c_level': 'Level HbA1c', 'blood_glucose_level': 'Level Glukosa Darah'}
+
+# Function to build form inputs (label dan nilai seperti yang diisi pengguna) from the test dataset
+# Semua baris yang lolos validasi form dipakai, agar distribusi input sama dengan dataset uji
+def form_inputs():
+    data = read_dataset(TEST_DATA, columns=FEATURE_COLUMNS)
+    features = data.to_numpy(dtype=np.float64)
+    # Nilai dibulatkan sesuai step widget (usia dan glukosa bilangan bulat, BMI dan HbA1c satu desimal)
+    features[:, [1, 7]] = np.round(features[:, [1, 7]])
+    features[:, [5, 6]] = np.round(features[:, [5, 6]], 1)
+    valid, _ = validate_batch(features)
+    encoders = get_encoders()
+    labels = {column: encoders[column].decode(data[column])
+              for column in ['gender', 'hypertension', 'heart_disease', 'smoking_history']}
+    labels['smoking_history'] = np.array([FORM_SMOKING_CHOICES.get(label, label) for label in labels['smoking_history']],
+                                         dtype=object)
+    valid &= np.isin(labels['smoking_history'], SMOKING_HISTORY_OPTIONS)
+    valid &= features[:, 1] >= 1
+    return [
+        {
+            'Jenis Kelamin': labels['gender'][i],
+            'Usia': int(features[i, 1]),
+            'Riwayat Hipertensi': labels['hypertension'][i],
+            'Riwayat Penyakit Jantung': labels['heart_disease'][i],
+            'Riwayat Merokok': labels['smoking_history'][i],
+            'BMI': float(features[i, 5]),
+            'Level HbA1c': float(features[i, 6]),
+            'Level Glukosa Darah': int(features[i, 7]),
+        }
+        for i in np.flatnonzero(valid)
+    ]
+
+# Function to compare the sampled form inputs with the test dataset (jumlah baris, rata-rata dan proporsi)
+def input_summary(inputs):
+    data = read_dataset(TEST_DATA, columns=FEATURE_COLUMNS)
+    return {
+        'rows': len(inputs),
+        'dataset_rows': len(data),
+        'mean': {column: {'inputs': float(np.mean([form[label] for form in inputs])), 'dataset': float(data[column].mean())}
+                 for column, label in SUMMARY_COLUMNS.items()},
+        'male_share': {'inputs': float(np.mean([form['Jenis Kelamin'] == 'Laki-laki' for form in inputs])),
+                       'dataset': float((data['gender'] == 1).mean())},
+    }
+
+# Function to build a patient name that passes validate_name (hanya huruf)
+def patient_name(session, request):
+    letters = ''.join(chr(ord('a') + int(digit)) for digit in f'{session}{request:04d}')
+    return f'Pasien {letters.capitalize()}'
+
+# Function to get the resident memory of this process in bytes
+def resident_memory():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource #fallback selain Linux: puncak memori
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+# Sesi in-process: langkah yang sama dengan handler tombol Prediksi di main.py
+class InProcessSession:
+    def __init__(self, session):
+        import main #fungsi yang dipakai halaman Streamlit
+        self.main = main
+        self.session = session
+        self.model, self.scaler = main.load_model_and_scaler()
+        self.encoders = get_encoders()
+
+    def submit(self, form, request):
+        main, encoders = self.main, self.encoders
+        name = patient_name(self.session, request)
+        is_valid, error_msg = main.validate_name(name)
+        if not is_valid:
+            raise ValueError(error_msg)
+        input_data = [
+            encoders['gender'].encode_one(form['Jenis Kelamin']),
+            form['Usia'],
+            encoders['hypertension'].encode_one(form['Riwayat Hipertensi']),
+            encoders['heart_disease'].encode_one(form['Riwayat Penyakit Jantung']),
+            encoders['smoking_history'].encode_one(form['Riwayat Merokok']),
+            form['BMI'],
+            form['Level HbA1c'],
+            form['Level Glukosa Darah'],
+        ]
+        result, recommendations, _ = main.predict_diabetes_routed(input_data, self.scaler, key=name)
+        if result is None:
+            raise RuntimeError("Prediksi gagal")
+        history_store.get_history_store().append([{
+            'Nama': name,
+            'Jenis Kelamin': form['Jenis Kelamin'],
+            'Usia': form['Usia'],
+            'Hipertensi': form['Riwayat Hipertensi'],
+            'Penyakit Jantung': form['Riwayat Penyakit Jantung'],
+            'Riwayat Merokok': form['Riwayat Merokok'],
+            'BMI': form['BMI'],
+            'Level HbA1c': form['Level HbA1c'],
+            'Glukosa Darah': form['Level Glukosa Darah'],
+            'Hasil': result,
+        }])
+
+# Sesi AppTest: script main.py dijalankan ulang untuk setiap interaksi, seperti browser sungguhan
+# AppTest memakai state global Streamlit, sehingga run dari sesi yang berbeda dijalankan bergantian;
+# latensi mode ini sudah termasuk waktu menunggu giliran dari sesi lain
+class AppTestSession:
+    _run_lock = threading.Lock()
+
+    def __init__(self, session, timeout=60):
+        from streamlit.testing.v1 import AppTest #menjalankan main.py tanpa server dan browser
+        self.session = session
+        self.app = AppTest.from_file('main.py', default_timeout=timeout)
+        with self._run_lock:
+            self.app.run()
+
+    def _widget(self, widgets, label):
+        return next(widget for widget in widgets if widget.label == label)
+
+    def submit(self, form, request):
+        app = self.app
+        app.text_input[0].input(patient_name(self.session, request))
+        for label in ['Jenis Kelamin', 'Riwayat Hipertensi', 'Riwayat Penyakit Jantung', 'Riwayat Merokok']:
+            self._widget(app.selectbox, label).select(form[label])
+        for label in ['Usia', 'BMI', 'Level HbA1c', 'Level Glukosa Darah']:
+            self._widget(app.number_input, label).set_value(form[label])
+        self._widget(app.button, 'Prediksi').click()
+        with self._run_lock:
+            app.run()
+        if app.exception or app.error:
+            raise RuntimeError(str((app.exception or app.error)[0].value))
+
+SESSION_TYPES = {
+    'inprocess': InProcessSession,
+    'apptest': AppTestSession,
+}
+
+# Function to run one concurrency level (semua sesi mulai bersamaan)
+def run_level(session_class, inputs, sessions, requests, think_time, seed):
+    prediction_cache.clear()
+    barrier = threading.Barrier(sessions + 1)
+    latencies = [[] for _ in range(sessions)]
+    errors = [0] * sessions
+
+    def simulate(session):
+        rng = np.random.default_rng(seed + session)
+        client = session_class(session)
+        barrier.wait()
+        for request in range(requests):
+            form = inputs[rng.integers(len(inputs))]
+            start = time.perf_counter()
+            try:
+                client.submit(form, request)
+            except Exception:
+                errors[session] += 1
+            latencies[session].append(time.perf_counter() - start)
+            if think_time:
+                time.sleep(rng.exponential(think_time))
+
+    threads = [threading.Thread(target=simulate, args=(session,), name=f'session-{session}')
+               for session in range(sessions)]
+    memory_before = resident_memory()
+    for thread in threads:
+        thread.start()
+    # Waktu mulai diukur setelah semua sesi siap (sesi AppTest butuh run pertama yang lama)
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # Riwayat yang masih di antrian ikut dihitung sebagai bagian dari beban
+    history_store.get_history_store().flush()
+    memory_after = resident_memory()
+
+    durations = np.concatenate([np.asarray(session_latencies) for session_latencies in latencies])
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+    return {
+        'sessions': sessions,
+        'requests': len(durations),
+        'errors': sum(errors),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(durations) / elapsed,
+        'p50_ms': p50 * 1e3,
+        'p95_ms': p95 * 1e3,
+        'p99_ms': p99 * 1e3,
+        'max_ms': durations.max() * 1e3,
+        'memory_growth_kb': (memory_after - memory_before) / 1024,
+        'memory_per_session_kb': (memory_after - memory_before) / 1024 / sessions,
+    }
+
+# Function to run every concurrency level; riwayat ditulis ke database sementara, bukan riwayat aplikasi
+def run(mode='inprocess', levels=SESSION_LEVELS, requests=50, think_time=0.0, seed=42):
+    inputs = form_inputs()
+    session_class = SESSION_TYPES[mode]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        previous_store = history_store._store
+        store = WriteBehindHistoryStore(SQLiteHistoryStore(os.path.join(directory, 'history.db'), legacy_csv=None))
+        history_store._store = store
+        try:
+            # Satu sesi pemanasan agar model, modul dan cache import tidak dihitung sebagai memori per sesi
+            session_class(0).submit(inputs[0], 0)
+            for sessions in levels:
+                results.append(run_level(session_class, inputs, sessions, requests, think_time, seed))
+        finally:
+            history_store._store = previous_store
+            store.close()
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'mode': mode,
+        'requests_per_session': requests,
+        'think_time_s': think_time,
+        'inputs': input_summary(inputs),
+        'levels': results,
+    }
+
+# Function to find the highest concurrency level whose p95 latency is within the budget
+def capacity(report, max_p95_ms):
+    within = [level['sessions'] for level in report['levels']
+              if level['p95_ms'] <= max_p95_ms and level['errors'] == 0]
+    return max(within) if within else None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test alur Prediksi dengan banyak sesi pengguna bersamaan")
+    parser.add_argument('--mode', choices=list(SESSION_TYPES), default='inprocess')
+    parser.add_argument('--sessions', type=int, nargs='+', default=SESSION_LEVELS, help="tingkat konkurensi yang diuji")
+    parser.add_argument('--requests', type=int, default=50, help="jumlah prediksi per sesi")
+    parser.add_argument('--think-time', type=float, default=0.0, help="rata-rata jeda antar prediksi per sesi (detik)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-p95-ms', type=float, help="batas latensi p95; keluar dengan kode 1 jika dilampaui")
+    parser.add_argument('--output', help="simpan laporan ke file JSON")
+    args = parser.parse_args()
+
+    report = run(args.mode, args.sessions, args.requests, args.think_time, args.seed)
+    if args.max_p95_ms is not None:
+        report['max_p95_ms'] = args.max_p95_ms
+        report['capacity_sessions'] = capacity(report, args.max_p95_ms)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    summary = report['inputs']
+    print(f"Inputs: {summary['rows']} of {summary['dataset_rows']} test rows; mean input/dataset " +
+          ", ".join(f"{column} {values['inputs']:.2f}/{values['dataset']:.2f}" for column, values in summary['mean'].items()))
+    print(f"{'sessions':>8} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'KB/session':>10}")
+    for level in report['levels']:
+        print(f"{level['sessions']:>8} {level['requests']:>8} {level['errors']:>6} {level['throughput_per_s']:>9.1f} "
+              f"{level['p50_ms']:>8.2f} {level['p95_ms']:>8.2f} {level['p99_ms']:>8.2f} {level['max_ms']:>8.2f} "
+              f"{level['memory_per_session_kb']:>10.1f}")
+
+    if args.max_p95_ms is not None:
+        print(f"Capacity within p95 {args.max_p95_ms:.0f} ms: {report['capacity_sessions'] or 0} sessions")
+        if report['capacity_sessions'] != max(args.sessions):
+            sys.exit(1)
@@ -1,514 +1,517 @@
-import streamlit as st #untuk membuat web
-import numpy as np #untuk komputasi numerik dlm python #untuk memproses data
-import pandas as pd #analisis data
-import joblib #menyimpan model machine learning yang sudah di latih
-import os #menyimpan dan mengelola file yang di unggah
-import logging #untuk mencatat berbagai aktivitas dan monitoring aplikasi
-import plotly.express as px #visualisasi data
-from config import MODEL_PATH, SCALER_PATH, HISTORY_FILE, AGE_RANGE, BMI_RANGE, HBA1C_RANGE, GLUCOSE_RANGE
-
-# Konfigurasi logging
-logging.basicConfig(
-    level=logging.ERROR,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
-
-# Function to load global model and scaler (for single predict)
-def load_model_and_scaler():
-    try:
-        model = joblib.load(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-        return model, scaler
-    except FileNotFoundError:
-        st.error("Model or scaler not found! Please ensure the files are available in the 'models/' folder.")
-        return None, None
-    except Exception as e:
-        st.error(f"Error while loading the model or scaler: {e}")
-        return None, None
-
-# Function for prediction
-def predict_diabetes(input_data, model, scaler):
-    try:
-        # Validasi range nilai
-        if not (AGE_RANGE[0] <= input_data[1] <= AGE_RANGE[1]):  # age
-            raise ValueError("Usia harus antara 0-120 tahun")
-        if not (BMI_RANGE[0] <= input_data[5] <= BMI_RANGE[1]):  # BMI
-            raise ValueError("BMI harus antara 10-50")
-        if not (HBA1C_RANGE[0] <= input_data[6] <= HBA1C_RANGE[1]):   # HbA1c
-            raise ValueError("HbA1c harus antara 3-15")
-        if not (GLUCOSE_RANGE[0] <= input_data[7] <= GLUCOSE_RANGE[1]):  # Blood glucose
-            raise ValueError("Glukosa darah harus antara 50-300")
-            
-        input_scaled = scaler.transform([input_data])
-        prediction = model.predict(input_scaled)
-        return 'Diabetes' if prediction[0] == 1 else 'Non-Diabetes'
-    except Exception as e:
-        st.error(f"Error during prediction: {e}")
-        return None
-
-# Function to calculate BMI
-def calculate_bmi(weight, height):
-    try:
-        # BMI = weight (kg) / (height (m) ^ 2)
-        bmi = weight / (height / 100) ** 2
-        return round(bmi, 2)
-    except Exception as e:
-        st.error(f"Error during BMI calculation: {e}")
-        return None
-    
-# Function to save prediction history
-def save_to_history(data):
-    try:
-        history_file = HISTORY_FILE
-        
-        # Mengubah nama kolom dari bahasa Inggris ke Indonesia
-        data.columns = ['Nama', 'Jenis Kelamin', 'Usia', 'Hipertensi', 'Penyakit Jantung', 
-                       'Riwayat Merokok', 'BMI', 'Level HbA1c', 'Glukosa Darah', 'Hasil']
-        
-        # Menyimpan ke CSV
-        if os.path.exists(history_file):
-            # Jika file sudah ada, tambahkan tanpa header
-            data.to_csv(history_file, mode='a', header=False, index=False)
-        else:
-            # Jika file belum ada, buat baru dengan header
-            data.to_csv(history_file, mode='w', header=True, index=False)
-            
-        st.success("✅ Data berhasil disimpan!")
-        
-    except Exception as e:
-        st.error("❌ Gagal menyimpan riwayat prediksi. Silakan coba lagi.")
-        logging.error(f"Error saving history: {str(e)}")
-
-# Function to load prediction history
-def load_history():
-    history_file = HISTORY_FILE
-    if os.path.exists(history_file):
-        return pd.read_csv(history_file)
-    else:
-        return pd.DataFrame(columns=['Name', 'Gender', 'Age', 'Hypertension', 'Heart Disease', 
-                                     'Smoking History', 'BMI', 'HbA1c Level', 'Blood Glucose', 'Result'])
-
-def validate_name(name):
-    if not name.strip():
-        return False, "Nama pasien tidak boleh kosong!"
-    if len(name) < 2:
-        return False, "Nama pasien terlalu pendek!"
-    if not name.replace(" ", "").isalpha():
-        return False, "Nama hanya boleh mengandung huruf!"
-    return True, ""
-
-def validate_input(data):
-    errors = []
-    
-    # Validasi nama
-    if len(data['name']) < 2:
-        errors.append("Nama terlalu pendek")
-    
-    # Validasi usia
-    if not (0 <= data['age'] <= 120):
-        errors.append("Usia tidak valid")
-    
-    # Validasi BMI
-    if not (10 <= data['bmi'] <= 50):
-        errors.append("BMI tidak valid")
-    
-    return errors
-
-def get_recommendations(result, bmi, glucose, hba1c, smoking_status, hypertension, heart_disease, age):
-    recommendations = []
-    
-    # Rekomendasi berdasarkan status merokok
-    if smoking_status == 'Perokok Aktif':
-        recommendations.extend([
-            "***Status: Perokok Aktif 🚬***",
-            "- Sangat disarankan untuk berhenti merokok karena meningkatkan risiko komplikasi diabetes",   
-        ])
-
-    elif smoking_status == 'Mantan Perokok':
-        recommendations.extend([
-            "***Status: Mantan Perokok 🚬***",
-            "- Pertahankan untuk tidak merokok kembali dan hindari paparan asap rokok pasif"
-        ])
-    
-    elif smoking_status == 'Tidak Pernah':
-        recommendations.extend([
-            "***Status: Tidak Pernah Merokok ✨***",
-            "- Pertahankan gaya hidup bebas rokok Anda!",
-        ])
-    
-    # Rekomendasi untuk hipertensi
-    if hypertension:
-        recommendations.extend([
-            "Status: Memiliki Hipertensi ⚠️",
-            "- Batasi konsumsi garam (<2300mg/hari)",
-            "- Hindari makanan tinggi sodium",
-            "- Konsumsi makanan kaya potasium seperti pisang dan alpukat"
-        ])
-    
-    # Rekomendasi untuk penyakit jantung
-    if heart_disease:
-        recommendations.extend([
-            "***Status: Memiliki Penyakit Jantung ❤️***",
-            "- Rutin kontrol ke dokter jantung",
-            "- Batasi aktivitas fisik berat",
-            "- Konsumsi makanan rendah lemak jenuh",
-            "- Hindari stres berlebihan"
-        ])
-    
-    if result == 'Diabetes':
-        # Rekomendasi spesifik berdasarkan glukosa
-        if glucose > 200:
-            recommendations.extend([
-                f"***Glukosa {glucose} mg/dL (>200) 🔴***",
-                "- Kadar gula darah Anda sangat tinggi",
-                "- Kontrol gula darah secara teratur"
-                "- Periksa kadar gula darah setiap hari",
-                "- Segera Konsultasikan dengan dokter"
-            ])
-        elif glucose > 150:
-            recommendations.extend([
-                f"Glukosa {glucose} mg/dL (>150) 🟡",
-                "- Waspada! Kadar gula darah Anda mulai tinggi",
-                "- Mulai batasi makanan manis dan karbohidrat tinggi",
-                "- Tingkatkan aktivitas fisik minimal 30 menit per hari",
-                "- Lakukan pemeriksaan gula darah rutin",
-                "- Konsultasi dengan ahli gizi untuk penyesuaian pola makan"
-            ])
-        
-        # Rekomendasi spesifik berdasarkan BMI
-        if bmi > 30:
-            recommendations.extend([
-                f"***BMI {bmi:.1f} (Obesitas) ⚠️***",
-                "- Program penurunan berat badan intensif",
-                "- Segera konsultasi dengan ahli gizi"
-            ])
-        elif bmi > 25:
-            recommendations.extend([
-                f"***BMI {bmi:.1f} (Overweight) ⚠️***",
-                "- Program penurunan berat badan moderat",
-                "- Disarankan untuk konsultasi dengan ahli gizi"
-            ])
-        
-        # Rekomendasi spesifik berdasarkan HbA1c
-        if hba1c > 8:
-            recommendations.extend([
-                f"***HbA1c {hba1c}% (>8) 🔴***",
-                "- Kadar HbA1c sangat tinggi",
-                "- Segera konsultasikan dengan dokter",
-            ])
-        elif hba1c > 6.5:
-            recommendations.extend([
-                f"***HbA1c {hba1c}% (>6.5) 🟡***",
-                "- Kadar HbA1c di atas normal",
-                "- Disarankan untuk konsultasi dengan dokter"
-            ])
-        
-        # Rekomendasi umum untuk penderita diabetes
-        recommendations.extend([
-            "Rekomendasi Umum Diabetes:",
-            "- Kunjungi Dokter untuk pemeriksaan lebih lanjut",
-            "- Olahraga minimal 30 menit/hari",
-            "- Batasi konsumsi karbohidrat dan gula",
-            "- Konsumsi makanan tinggi serat",
-            "- Pantau gula darah secara rutin"
-        ])
-    else:
-        # Rekomendasi untuk non-diabetes dengan faktor risiko
-        if bmi > 30:
-            recommendations.extend([
-                f"***BMI {bmi:.1f} (Obesitas) ⚠️***",
-                "- Risiko tinggi diabetes",
-                "- Program penurunan berat badan diperlukan",
-                "- Konsultasi dengan dokter atau ahli gizi"
-            ])
-        elif bmi > 25:
-            recommendations.extend([
-                f"***BMI {bmi:.1f} (Overweight) ⚠️***",
-                "- Risiko diabetes meningkat",
-                "- Pertimbangkan penurunan berat badan"
-            ])
-        
-        if glucose > 140:
-            recommendations.extend([
-                f"***Glukosa {glucose} mg/dL (>140) ⚠️***",
-                "- Waspadai pre-diabetes",
-                "- Periksa gula darah secara berkala"
-            ])
-        
-        recommendations.extend([
-            "***Rekomendasi Pencegahan Diabetes:***", 
-            "- Kunjungi Dokter untuk pemeriksaan lebih lanjut",
-            "- Jaga Pola hidup sehat",
-            "- Olahraga minimal 150 menit per minggu",
-            "- Jaga Pola makan seimbang",
-            "- Monitoring gula darah secara rutin"
-        ])
-    
-    return recommendations
-
-def show_history_analytics(history):
-    st.write("### Visualisasi Data")
-    
-    # Cek apakah ada data riwayat
-    if history.empty:
-        st.info("⚠️ Belum ada data riwayat prediksi. Silakan lakukan prediksi terlebih dahulu.")
-        return
-    
-    try:
-        # Hitung jumlah untuk setiap hasil
-        results_count = history['Hasil'].value_counts()
-        total_predictions = len(history)
-        
-        # Buat dua kolom untuk informasi dan pie chart
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Tampilkan informasi dalam card/box dengan ukuran teks yang lebih kecil
-            st.markdown("""
-            <div style='background-color: #1e3d59; padding: 20px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 100%; display: flex; flex-direction: column; justify-content: center;'>
-                <h4 style='text-align: center; color: #ffffff; margin-bottom: 15px; font-size: 16px;'>Ringkasan Prediksi</h4>
-                <h2 style='text-align: center; color: #ffffff; margin-bottom: 15px; font-size: 24px;'>{} Orang</h2>
-                <hr style='margin: 15px 0; border-color: rgba(255,255,255,0.2);'>
-                <p style='font-size: 16px; color: #ffffff; text-align: center; margin: 10px 0;'>🔴 Diabetes: {} orang</p>
-                <p style='font-size: 16px; color: #ffffff; text-align: center; margin: 10px 0;'>🟢 Non-Diabetes: {} orang</p>
-            </div>
-            """.format(total_predictions, 
-                      results_count.get('Diabetes', 0),
-                      results_count.get('Non-Diabetes', 0)), 
-            unsafe_allow_html=True)
-        
-        with col2:
-            # Pie chart hasil prediksi
-            fig1 = px.pie(values=results_count.values, 
-                         names=results_count.index,
-                         title="Distribusi Hasil Prediksi",
-                         color_discrete_sequence=['#118B50', '#FF2929'])
-            fig1.update_layout(
-                title_x=0.5,
-                title_font_size=16,
-                height=300,
-                margin=dict(t=30, b=0, l=0, r=0),
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-            
-    except KeyError:
-        st.warning("⚠️ Format data riwayat tidak sesuai. Silakan pastikan data prediksi tersimpan dengan benar.")
-    except Exception as e:
-        st.error(f"❌ Terjadi kesalahan dalam menampilkan visualisasi: {str(e)}")
-        logging.error(f"Error in show_history_analytics: {str(e)}")
-
-def get_bmi_recommendations(bmi):
-    recommendations = []
-    
-    if bmi < 18.5:
-        recommendations.extend([
-            f"***BMI {bmi:.1f} (Anda Kekurangan Berat Badan) ⚠️***",
-            "- Tingkatkan asupan kalori dengan makanan bergizi",
-            "- Konsumsi protein berkualitas tinggi",
-            "- Lakukan olahraga secara teratur",
-            "- Konsultasikan dengan ahli gizi untuk program penambahan berat badan yang sehat"
-        ])
-    elif 18.5 <= bmi < 24.9:
-        recommendations.extend([
-            f"***BMI {bmi:.1f} (Berat Badan Anda Normal) ✅***",
-            "- Pertahankan pola makan seimbang",
-            "- Lakukan olahraga rutin minimal 150 menit per minggu",
-            "- Jaga kualitas tidur yang baik",
-            "- Lanjutkan gaya hidup sehat yang sudah dijalani"
-        ])
-    elif 25 <= bmi < 29.9:
-        recommendations.extend([
-            f"***BMI {bmi:.1f} (Anda Kelebihan Berat Badan) ⚠️***",
-            "- Kurangi porsi makan secara bertahap",
-            "- Tingkatkan aktivitas fisik menjadi 45-60 menit per hari",
-            "- Hindari makanan tinggi gula dan lemak jenuh",
-            "- Pertimbangkan untuk berkonsultasi dengan ahli gizi",
-        ])
-    else:  # BMI >= 30
-        recommendations.extend([
-            f"***BMI {bmi:.1f} (Anda Obesitas) 🔴***",
-            "- Segera konsultasi dengan dokter atau ahli gizi",
-            "- Mulai program penurunan berat badan yang aman",
-            "- Olahraga secara teratur selama minimal 30 menit setiap hari",
-            "- Catat asupan makanan harian",
-            "- Periksa kesehatan secara rutin",
-            "- Hindari makanan dan minuman tinggi lemak"
-        ])
-            
-    return recommendations
-
-def show_about():
-    st.write("## Tentang Aplikasi Prediksi Diabetes")
-    
-    st.write("### Deskripsi")
-    st.write("""
-    Aplikasi ini adalah alat bantu untuk melakukan prediksi awal risiko diabetes berdasarkan beberapa parameter kesehatan. 
-    Hasil prediksi hanya bersifat petunjuk awal dan TIDAK menggantikan diagnosis medis profesional.
-    """)
-    
-    st.write("### ⚠️ Penting!")
-    st.write("""
-    - Hasil prediksi ini BUKAN diagnosis final dan TIDAK dapat dijadikan sebagai keputusan medis.
-    - Konsultasi dengan dokter atau tenaga medis profesional TETAP DIPERLUKAN untuk diagnosis yang akurat.
-    - Aplikasi ini hanya bertujuan sebagai alat skrining awal.
-    """)
-    
-    st.write("### 📝 Cara Penggunaan")
-    st.write("""
-    1. **Menu Prediksi**
-       - Isi semua data yang diminta dengan lengkap dan akurat
-       - Pastikan data yang dimasukkan sesuai 
-       - Tekan tombol 'Prediksi' untuk melihat hasil
-       - Baca rekomendasi yang diberikan sebagai panduan umum
-    
-    2. **Menu Hitung BMI**
-       - Masukkan berat badan (kg) dan tinggi badan (cm)
-       - Sistem akan menghitung BMI dan memberikan kategori serta rekomendasi
-
-    """)
-        
-    #3. **Menu Riwayat**
-       #- Lihat riwayat prediksi sebelumnya
-       #- Unduh data riwayat dalam format CSV
-       #- Analisis tren hasil prediksi
-
-# Main function for Streamlit
-def main():
-    st.title("Prediksi Diabetes 🩺")
-    st.sidebar.title("Menu")
-    menu = st.sidebar.radio("Pilih Menu:", ["Prediksi", "Hitung BMI", "Tentang Aplikasi"])
-
-    # Load model dan scaler
-    model, scaler = load_model_and_scaler()
-
-    if menu == "Prediksi":
-        st.write("Masukkan data berikut untuk prediksi:")
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            name = st.text_input('Nama Pasien', value='')
-            gender = st.selectbox('Jenis Kelamin', ['Perempuan', 'Laki-laki'])
-            age = st.number_input('Usia', min_value=0, max_value=120, step=1, value=30)
-
-        with col2:
-            hypertension = st.selectbox('Riwayat Hipertensi', ['Tidak', 'Ya'])
-            heart_disease = st.selectbox('Riwayat Penyakit Jantung', ['Tidak', 'Ya'])
-            smoking_history = st.selectbox('Riwayat Merokok', ['Tidak Pernah', 'Mantan Perokok', 'Perokok Aktif'])
-
-        with col3:
-            bmi = st.number_input('BMI', min_value=10.0, max_value=50.0, step=0.1, value=25.0)
-            hba1c_level = st.number_input('Level HbA1c', min_value=3.0, max_value=15.0, step=0.1, value=5.0)
-            blood_glucose_level = st.number_input('Level Glukosa Darah', min_value=50, max_value=300, step=1, value=100)
-
-        # Konversi input
-        gender = 1 if gender == 'Laki-laki' else 0
-        hypertension = 1 if hypertension == 'Ya' else 0
-        heart_disease = 1 if heart_disease == 'Ya' else 0
-        smoking_history_map = {'Tidak Pernah': 0, 'Mantan Perokok': 2, 'Perokok Aktif': 1}
-        smoking_history = smoking_history_map[smoking_history]
-
-        input_data = [gender, age, hypertension, heart_disease, smoking_history, bmi, hba1c_level, blood_glucose_level]
-
-        if model and scaler:
-            if st.button("Prediksi"):
-                is_valid, error_msg = validate_name(name)
-                if not is_valid:
-                    st.error(error_msg)
-                else:
-                    result = predict_diabetes(input_data, model, scaler)
-                    if result:
-                        if result == 'Diabetes':
-                            st.markdown("<div style='background-color: #ff4d4d; color: white; padding: 10px; border-radius: 5px; text-align: center;'>HASIL SCREENING: TERINDIKASI DIABETES</div>", unsafe_allow_html=True)
-                        else:
-                            st.markdown("<div style='background-color: #4caf50; color: white; padding: 10px; border-radius: 5px; text-align: center;'>HASIL SCREENING: TERINDIKASI NON-DIABETES</div>", unsafe_allow_html=True)
-                        
-                        # Tampilkan rekomendasi
-                        st.write("### Rekomendasi Kesehatan:")
-                        recommendations = get_recommendations(
-                            result, 
-                            bmi, 
-                            blood_glucose_level, 
-                            hba1c_level,
-                            list(smoking_history_map.keys())[list(smoking_history_map.values()).index(smoking_history)],
-                            hypertension == 1,
-                            heart_disease == 1,
-                            age
-                        )
-                        for rec in recommendations:
-                            st.write(f"- {rec}")
-
-                        # Buat DataFrame untuk history
-                        data = pd.DataFrame({
-                            'Nama': [name],
-                            'Jenis Kelamin': ['Laki-laki' if gender == 1 else 'Perempuan'],
-                            'Usia': [age],
-                            'Hipertensi': ['Ya' if hypertension == 1 else 'Tidak'],
-                            'Penyakit Jantung': ['Ya' if heart_disease == 1 else 'Tidak'],
-                            'Riwayat Merokok': [list(smoking_history_map.keys())[list(smoking_history_map.values()).index(smoking_history)]],
-                            'BMI': [bmi],
-                            'Level HbA1c': [hba1c_level],
-                            'Glukosa Darah': [blood_glucose_level],
-                            'Hasil': [result]
-                        })
-                        
-                        save_to_history(data)
-
-    elif menu == "Hitung BMI":
-        weight = st.number_input("Berat Badan (kg)", min_value=1.0, step=0.1, value=70.0)
-        height = st.number_input("Tinggi Badan (cm)", min_value=1.0, step=0.1, value=170.0)
-
-        if st.button("Hitung BMI"):
-            bmi = calculate_bmi(weight, height)
-            if bmi:
-                st.success(f"BMI Anda adalah {bmi}")
-                if bmi < 18.5:
-                    st.info("Kategori: Kekurangan Berat Badan")
-                elif 18.5 <= bmi < 24.9:
-                    st.info("Kategori: Normal")
-                elif 25 <= bmi < 29.9:
-                    st.info("Kategori: Kelebihan Berat Badan")
-                else:
-                    st.info("Kategori: Obesitas")
-                
-                st.write("### Rekomendasi:")
-                recommendations = get_bmi_recommendations(bmi)
-                for rec in recommendations:
-                    st.write(f"- {rec}")
-
-    #elif menu == "Riwayat":
-        #st.write("Riwayat Prediksi:")
-        #history = load_history()
-        #if history.empty:
-            #st.info("Belum ada riwayat prediksi.")
-        #else:
-            # Terjemahkan nama kolom
-            #history.columns = ['Nama', 'Jenis Kelamin', 'Usia', 'Hipertensi', 'Penyakit Jantung', 
-                             #'Riwayat Merokok', 'BMI', 'Level HbA1c', 'Glukosa Darah', 'Hasil']
-            
-            # Tampilkan data dengan nomor index
-            #st.write("### Data Riwayat Prediksi")
-            #history.index = range(1, len(history) + 1)
-            #st.dataframe(history)
-            
-            # Tombol unduh riwayat
-            #csv = history.to_csv(index=False)
-            #st.download_button(
-                #label="Unduh Riwayat (CSV)",
-                #data=csv,
-                #file_name='riwayat_prediksi_diabetes.csv',
-                #mime='text/csv'
-            #)
-
-            #if st.button("Visualisasi Riwayat"):
-                #show_history_analytics(history)
-
-    elif menu == "Tentang Aplikasi":
-        show_about()
-
-if __name__ == '__main__':
-    main()
+import streamlit as st #untuk membuat web
+import logging #untuk mencatat berbagai aktivitas dan monitoring aplikasi
+from recommendations import get_bmi_recommendations, get_bmi_category #rekomendasi kesehatan
+from metrics import start_json_dump #dump metrik performa secara berkala
+from startup import start_warmup #memuat model dan modul berat di background
+from config import (FEATURE_COLUMNS, SMOKING_HISTORY_OPTIONS, AGE_BANDS, BMI_BANDS, ANALYTICS_MAX_POINTS,
+                    METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL, DRIFT_PSI_WARNING, DRIFT_PSI_ALERT, DRIFT_KS_ALERT,
+                    DRIFT_MIN_OBSERVATIONS)
+
+# pandas, plotly, joblib dan modul prediksi/riwayat di-import di dalam fungsi yang membutuhkannya,
+# sehingga menu seperti Hitung BMI dan Tentang Aplikasi tampil tanpa menunggu library tersebut
+
+# Warna grafik untuk setiap hasil prediksi
+RESULT_COLORS = {'Non-Diabetes': '#118B50', 'Diabetes': '#FF2929'}
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.ERROR,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('app.log'),
+        logging.StreamHandler()
+    ]
+)
+
+# Function to load global model and scaler (for single predict)
+# Artefak diambil dari registry, jadi hanya dimuat ulang jika file di disk berubah
+def load_model_and_scaler():
+    try:
+        from model_registry import load_model_and_scaler as registry_load_model_and_scaler
+        # Dengan USE_COMPILED_ARTIFACT, scaler bernilai None karena sudah dilipat ke model
+        return registry_load_model_and_scaler()
+    except FileNotFoundError:
+        st.error("Model or scaler not found! Please ensure the files are available in the 'models/' folder.")
+        return None, None
+    except Exception as e:
+        st.error(f"Error while loading the model or scaler: {e}")
+        return None, None
+
+# Function for prediction
+def predict_diabetes(input_data, model, scaler):
+    try:
+        from prediction import predict_single
+        # Validasi range nilai, scaling dan prediksi
+        return predict_single(input_data, model, scaler)
+    except Exception as e:
+        st.error(f"Error during prediction: {e}")
+        return None
+
+# Function for prediction + recommendations through the model router (pembagian model dan model shadow diatur di config)
+# Input yang sama dengan model yang sama diambil dari cache hasil
+def predict_diabetes_routed(input_data, scaler, key=None):
+    try:
+        from model_router import predict_routed_with_recommendations
+        return predict_routed_with_recommendations(input_data, scaler, key)
+    except Exception as e:
+        st.error(f"Error during prediction: {e}")
+        return None, None, None
+
+# Function to calculate BMI
+def calculate_bmi(weight, height):
+    try:
+        # BMI = weight (kg) / (height (m) ^ 2)
+        bmi = weight / (height / 100) ** 2
+        return round(bmi, 2)
+    except Exception as e:
+        st.error(f"Error during BMI calculation: {e}")
+        return None
+    
+# Function to save prediction history (list of dict dengan kolom riwayat)
+def save_to_history(records):
+    try:
+        from history_store import get_history_store
+
+        # Menyimpan ke history store (SQLite secara default, lihat HISTORY_BACKEND)
+        # Dengan HISTORY_WRITE_BEHIND record hanya dimasukkan ke antrian, penulisan ke disk di thread background
+        get_history_store().append(records)
+            
+        st.success("✅ Data berhasil disimpan!")
+        
+    except Exception as e:
+        st.error("❌ Gagal menyimpan riwayat prediksi. Silakan coba lagi.")
+        logging.error(f"Error saving history: {str(e)}")
+
+# Function to load prediction history (satu halaman jika limit diisi)
+def load_history(name=None, result=None, start=None, end=None, limit=None, offset=0):
+    from history_store import get_history_store
+    return get_history_store().query(name=name, result=result, start=start, end=end, limit=limit, offset=offset)
+
+def validate_name(name):
+    if not name.strip():
+        return False, "Nama pasien tidak boleh kosong!"
+    if len(name) < 2:
+        return False, "Nama pasien terlalu pendek!"
+    if not name.replace(" ", "").isalpha():
+        return False, "Nama hanya boleh mengandung huruf!"
+    return True, ""
+
+def validate_input(data):
+    errors = []
+    
+    # Validasi nama
+    if len(data['name']) < 2:
+        errors.append("Nama terlalu pendek")
+    
+    # Validasi usia
+    if not (0 <= data['age'] <= 120):
+        errors.append("Usia tidak valid")
+    
+    # Validasi BMI
+    if not (10 <= data['bmi'] <= 50):
+        errors.append("BMI tidak valid")
+    
+    return errors
+
+# Periode penggabungan grafik tren: label -> (frekuensi pandas, perkiraan jumlah hari per titik)
+TREND_PERIODS = {'Harian': ('D', 1), 'Mingguan': ('W', 7), 'Bulanan': ('MS', 30)}
+
+# Function to get a value from the session cache, dibangun ulang hanya jika versi riwayat berubah
+# Disimpan di st.session_state, sehingga rerun tanpa data baru tidak membuat ulang query, grafik dan HTML
+def session_cached(key, version, build):
+    cache = st.session_state.setdefault('analytics_cache', {})
+    entry = cache.get(key)
+    if entry is None or entry[0] != version:
+        entry = cache[key] = (version, build())
+    return entry[1]
+
+# Function to combine daily counts per period (mengurangi jumlah titik grafik tren)
+# Otomatis: periode terkecil yang jumlah titiknya tidak melebihi ANALYTICS_MAX_POINTS
+def resample_trend(daily, period):
+    import pandas as pd #analisis data
+    daily = daily.assign(bucket=pd.to_datetime(daily['bucket'], errors='coerce')).dropna(subset=['bucket'])
+    if period == 'Otomatis':
+        days = (daily['bucket'].max() - daily['bucket'].min()).days + 1 if len(daily) else 0
+        period = next((label for label, (_, length) in TREND_PERIODS.items() if days / length <= ANALYTICS_MAX_POINTS),
+                      'Bulanan')
+    frequency = TREND_PERIODS[period][0]
+    trend = daily.groupby([pd.Grouper(key='bucket', freq=frequency), 'result'])['count'].sum().reset_index()
+    return trend[trend['count'] > 0], period
+
+def show_history_analytics(store):
+    import plotly.express as px #visualisasi data
+
+    st.write("### Visualisasi Data")
+    
+    # Ringkasan dibaca dari agregat yang diperbarui setiap kali prediksi disimpan
+    # Query, grafik dan HTML di-cache per sesi dan hanya dibuat ulang jika ada riwayat baru
+    version = store.version()
+    totals = session_cached('totals', version, lambda: store.aggregates('total'))
+
+    # Cek apakah ada data riwayat
+    if totals.empty:
+        st.info("⚠️ Belum ada data riwayat prediksi. Silakan lakukan prediksi terlebih dahulu.")
+        return
+    
+    try:
+        # Hitung jumlah untuk setiap hasil
+        results_count = totals.set_index('result')['count']
+        total_predictions = int(results_count.sum())
+
+        def build_summary():
+            return """
+            <div style='background-color: #1e3d59; padding: 20px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 100%; display: flex; flex-direction: column; justify-content: center;'>
+                <h4 style='text-align: center; color: #ffffff; margin-bottom: 15px; font-size: 16px;'>Ringkasan Prediksi</h4>
+                <h2 style='text-align: center; color: #ffffff; margin-bottom: 15px; font-size: 24px;'>{} Orang</h2>
+                <hr style='margin: 15px 0; border-color: rgba(255,255,255,0.2);'>
+                <p style='font-size: 16px; color: #ffffff; text-align: center; margin: 10px 0;'>🔴 Diabetes: {} orang</p>
+                <p style='font-size: 16px; color: #ffffff; text-align: center; margin: 10px 0;'>🟢 Non-Diabetes: {} orang</p>
+            </div>
+            """.format(total_predictions, 
+                      results_count.get('Diabetes', 0),
+                      results_count.get('Non-Diabetes', 0))
+
+        def build_pie():
+            fig1 = px.pie(values=results_count.values, 
+                         names=results_count.index,
+                         title="Distribusi Hasil Prediksi",
+                         color=results_count.index,
+                         color_discrete_map=RESULT_COLORS)
+            fig1.update_layout(
+                title_x=0.5,
+                title_font_size=16,
+                height=300,
+                margin=dict(t=30, b=0, l=0, r=0),
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig1
+
+        # Buat dua kolom untuk informasi dan pie chart
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Tampilkan informasi dalam card/box dengan ukuran teks yang lebih kecil
+            st.markdown(session_cached('summary_html', version, build_summary), unsafe_allow_html=True)
+        
+        with col2:
+            # Pie chart hasil prediksi
+            st.plotly_chart(session_cached('result_pie', version, build_pie), use_container_width=True)
+
+        # Tren hasil prediksi, digabung per minggu/bulan jika rentang tanggal terlalu panjang
+        period = st.selectbox('Periode Tren', ['Otomatis'] + list(TREND_PERIODS))
+
+        def build_trend():
+            trend, used_period = resample_trend(store.aggregates('day'), period)
+            fig2 = px.line(trend, x='bucket', y='count', color='result',
+                           markers=len(trend) <= ANALYTICS_MAX_POINTS,
+                           title=f"Tren Prediksi {used_period}",
+                           labels={'bucket': 'Tanggal', 'count': 'Jumlah', 'result': 'Hasil'},
+                           color_discrete_map=RESULT_COLORS)
+            fig2.update_layout(title_x=0.5, title_font_size=16, height=350, paper_bgcolor='rgba(0,0,0,0)')
+            return fig2
+
+        st.plotly_chart(session_cached(('trend', period), version, build_trend), use_container_width=True)
+
+        # Distribusi hasil per kelompok pasien
+        dimensions = [
+            ('gender', 'Jenis Kelamin', ['Perempuan', 'Laki-laki']),
+            ('age_band', 'Kelompok Usia', [band for _, band in AGE_BANDS]),
+            ('bmi_band', 'Kategori BMI', [band for _, band in BMI_BANDS])
+        ]
+
+        def build_dimension(dimension, label, order):
+            fig = px.bar(store.aggregates(dimension), x='bucket', y='count', color='result',
+                         title=f"Hasil per {label}",
+                         category_orders={'bucket': order},
+                         labels={'bucket': label, 'count': 'Jumlah', 'result': 'Hasil'},
+                         color_discrete_map=RESULT_COLORS)
+            fig.update_layout(title_x=0.5, title_font_size=14, height=300, showlegend=False,
+                              margin=dict(t=30, b=0, l=0, r=0), paper_bgcolor='rgba(0,0,0,0)')
+            return fig
+
+        for col, (dimension, label, order) in zip(st.columns(len(dimensions)), dimensions):
+            with col:
+                fig = session_cached(('dimension', dimension), version,
+                                     lambda: build_dimension(dimension, label, order))
+                st.plotly_chart(fig, use_container_width=True)
+            
+    except KeyError:
+        st.warning("⚠️ Format data riwayat tidak sesuai. Silakan pastikan data prediksi tersimpan dengan benar.")
+    except Exception as e:
+        st.error(f"❌ Terjadi kesalahan dalam menampilkan visualisasi: {str(e)}")
+        logging.error(f"Error in show_history_analytics: {str(e)}")
+
+def show_about():
+    st.write("## Tentang Aplikasi Prediksi Diabetes")
+    
+    st.write("### Deskripsi")
+    st.write("""
+    Aplikasi ini adalah alat bantu untuk melakukan prediksi awal risiko diabetes berdasarkan beberapa parameter kesehatan. 
+    Hasil prediksi hanya bersifat petunjuk awal dan TIDAK menggantikan diagnosis medis profesional.
+    """)
+    
+    st.write("### ⚠️ Penting!")
+    st.write("""
+    - Hasil prediksi ini BUKAN diagnosis final dan TIDAK dapat dijadikan sebagai keputusan medis.
+    - Konsultasi dengan dokter atau tenaga medis profesional TETAP DIPERLUKAN untuk diagnosis yang akurat.
+    - Aplikasi ini hanya bertujuan sebagai alat skrining awal.
+    """)
+    
+    st.write("### 📝 Cara Penggunaan")
+    st.write("""
+    1. **Menu Prediksi**
+       - Isi semua data yang diminta dengan lengkap dan akurat
+       - Pastikan data yang dimasukkan sesuai 
+       - Tekan tombol 'Prediksi' untuk melihat hasil
+       - Baca rekomendasi yang diberikan sebagai panduan umum
+    
+    2. **Menu Prediksi Massal**
+       - Unggah file CSV berisi data banyak pasien sekaligus
+       - Baris dengan nilai di luar batas akan ditolak beserta alasannya
+       - Unduh hasil prediksi dalam format CSV
+
+    3. **Menu Hitung BMI**
+       - Masukkan berat badan (kg) dan tinggi badan (cm)
+       - Sistem akan menghitung BMI dan memberikan kategori serta rekomendasi
+
+    4. **Menu Riwayat**
+       - Lihat riwayat prediksi sebelumnya
+       - Cari berdasarkan nama atau hasil prediksi
+       - Unduh halaman riwayat yang ditampilkan dalam format CSV
+       - Analisis tren hasil prediksi
+
+    """)
+
+# Function to show input drift against the training data (sketch per fitur, tanpa membaca riwayat)
+def show_drift_monitor():
+    import pandas as pd #analisis data
+    import plotly.express as px #visualisasi data
+    from drift_monitor import get_monitor
+    from feature_encoding import get_encoders
+
+    monitor = get_monitor()
+    if monitor is None:
+        st.error("Monitoring drift tidak aktif, baseline data latih tidak dapat dimuat.")
+        return
+
+    report = pd.DataFrame(monitor.check())
+    if report['observations'].max() == 0:
+        st.info("Belum ada input yang diprediksi sejak aplikasi dijalankan.")
+        return
+
+    status_icons = {'ok': '🟢', 'warning': '🟡', 'alert': '🔴'}
+    alerts = report[report['status'] != 'ok']
+    if alerts.empty:
+        st.success("Distribusi input masih sesuai dengan data latih.")
+    else:
+        st.warning(f"Drift terdeteksi pada: {', '.join(alerts['feature'])}")
+
+    st.caption(f"PSI warning ≥ {DRIFT_PSI_WARNING}, alert ≥ {DRIFT_PSI_ALERT} atau KS ≥ {DRIFT_KS_ALERT}, "
+               f"dinilai setelah {DRIFT_MIN_OBSERVATIONS} input")
+    table = report.assign(status=report['status'].map(lambda status: f"{status_icons[status]} {status}"))
+    st.dataframe(table.set_index('feature'), use_container_width=True)
+
+    # Proporsi per bin: data latih vs input terbaru
+    feature = st.selectbox('Fitur', FEATURE_COLUMNS)
+    distribution = monitor.distribution(feature)
+    bins = distribution['bins']
+    encoder = get_encoders().get(feature)
+    if encoder is not None:
+        bins = [encoder.decode_one(code) or code for code in bins]
+    chart = pd.DataFrame({
+        'bin': bins * 2,
+        'proporsi': distribution['baseline'] + distribution['current'],
+        'data': ['Data Latih'] * len(bins) + ['Input Terbaru'] * len(bins),
+    })
+    fig = px.bar(chart, x='bin', y='proporsi', color='data', barmode='group',
+                 title=f"Distribusi {feature}", labels={'bin': feature, 'proporsi': 'Proporsi', 'data': ''})
+    fig.update_layout(title_x=0.5, title_font_size=16, height=350, paper_bgcolor='rgba(0,0,0,0)')
+    st.plotly_chart(fig, use_container_width=True)
+
+# Main function for Streamlit
+def main():
+    st.title("Prediksi Diabetes 🩺")
+    st.sidebar.title("Menu")
+
+    # Metrik performa ditulis berkala ke file JSON (thread hanya dibuat sekali per proses)
+    start_json_dump(METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL)
+    # Model dan modul berat dimuat di background sejak sesi pertama (hanya sekali per proses)
+    start_warmup()
+    menu = st.sidebar.radio("Pilih Menu:", ["Prediksi", "Prediksi Massal", "Hitung BMI", "Riwayat", "Monitoring Drift",
+                                          "Tentang Aplikasi"])
+
+    if menu == "Prediksi":
+        # Load model dan scaler (menunggu warm-up jika model belum selesai dimuat)
+        model, scaler = load_model_and_scaler()
+
+        st.write("Masukkan data berikut untuk prediksi:")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            name = st.text_input('Nama Pasien', value='')
+            gender = st.selectbox('Jenis Kelamin', ['Perempuan', 'Laki-laki'])
+            age = st.number_input('Usia', min_value=0, max_value=120, step=1, value=30)
+
+        with col2:
+            hypertension = st.selectbox('Riwayat Hipertensi', ['Tidak', 'Ya'])
+            heart_disease = st.selectbox('Riwayat Penyakit Jantung', ['Tidak', 'Ya'])
+            smoking_history = st.selectbox('Riwayat Merokok', SMOKING_HISTORY_OPTIONS)
+
+        with col3:
+            bmi = st.number_input('BMI', min_value=10.0, max_value=50.0, step=0.1, value=25.0)
+            hba1c_level = st.number_input('Level HbA1c', min_value=3.0, max_value=15.0, step=0.1, value=5.0)
+            blood_glucose_level = st.number_input('Level Glukosa Darah', min_value=50, max_value=300, step=1, value=100)
+
+        # Konversi input (encoding yang sama dipakai untuk file CSV di prediksi massal dan saat training)
+        from feature_encoding import get_encoders
+        encoders = get_encoders()
+        gender = encoders['gender'].encode_one(gender)
+        hypertension = encoders['hypertension'].encode_one(hypertension)
+        heart_disease = encoders['heart_disease'].encode_one(heart_disease)
+        smoking_history = encoders['smoking_history'].encode_one(smoking_history)
+
+        input_data = [gender, age, hypertension, heart_disease, smoking_history, bmi, hba1c_level, blood_glucose_level]
+
+        if model is not None:
+            if st.button("Prediksi"):
+                is_valid, error_msg = validate_name(name)
+                if not is_valid:
+                    st.error(error_msg)
+                else:
+                    result, recommendations, model_name = predict_diabetes_routed(input_data, scaler, key=name)
+                    if result:
+                        if result == 'Diabetes':
+                            st.markdown("<div style='background-color: #ff4d4d; color: white; padding: 10px; border-radius: 5px; text-align: center;'>HASIL SCREENING: TERINDIKASI DIABETES</div>", unsafe_allow_html=True)
+                        else:
+                            st.markdown("<div style='background-color: #4caf50; color: white; padding: 10px; border-radius: 5px; text-align: center;'>HASIL SCREENING: TERINDIKASI NON-DIABETES</div>", unsafe_allow_html=True)
+                        
+                        st.caption(f"Model: {model_name}")
+
+                        # Tampilkan rekomendasi
+                        st.write("### Rekomendasi Kesehatan:")
+                        for rec in recommendations:
+                            st.write(f"- {rec}")
+
+                        # Buat record untuk history
+                        data = {
+                            'Nama': name,
+                            'Jenis Kelamin': encoders['gender'].decode_one(gender),
+                            'Usia': age,
+                            'Hipertensi': encoders['hypertension'].decode_one(hypertension),
+                            'Penyakit Jantung': encoders['heart_disease'].decode_one(heart_disease),
+                            'Riwayat Merokok': encoders['smoking_history'].decode_one(smoking_history),
+                            'BMI': bmi,
+                            'Level HbA1c': hba1c_level,
+                            'Glukosa Darah': blood_glucose_level,
+                            'Hasil': result
+                        }
+                        
+                        save_to_history([data])
+
+    elif menu == "Prediksi Massal":
+        st.write("Unggah file CSV berisi data pasien untuk prediksi massal.")
+        st.caption(f"Kolom yang dibutuhkan: {', '.join(FEATURE_COLUMNS)}")
+        uploaded_file = st.file_uploader("File CSV", type=['csv'])
+
+        # Model hanya dimuat setelah ada file yang diunggah
+        model, scaler = load_model_and_scaler() if uploaded_file is not None else (None, None)
+
+        if uploaded_file is not None and model is not None:
+            import pandas as pd #analisis data
+            from prediction import predict_diabetes_batch
+
+            try:
+                data = pd.read_csv(uploaded_file)
+                results = predict_diabetes_batch(data, model, scaler)
+            except Exception as e:
+                st.error(f"Error during batch prediction: {e}")
+                logging.error(f"Error in batch prediction: {str(e)}")
+            else:
+                rejected = results[results['Alasan Ditolak'] != '']
+                results_count = results['Hasil'].value_counts()
+
+                col1, col2, col3 = st.columns(3)
+                col1.metric("🔴 Diabetes", int(results_count.get('Diabetes', 0)))
+                col2.metric("🟢 Non-Diabetes", int(results_count.get('Non-Diabetes', 0)))
+                col3.metric("⚠️ Ditolak", len(rejected))
+
+                if not rejected.empty:
+                    st.write("### Baris yang Ditolak")
+                    st.dataframe(rejected)
+
+                st.write("### Hasil Prediksi")
+                st.dataframe(results)
+                st.download_button(
+                    label="Unduh Hasil (CSV)",
+                    data=results.to_csv(index=False),
+                    file_name='hasil_prediksi_massal.csv',
+                    mime='text/csv'
+                )
+
+    elif menu == "Hitung BMI":
+        weight = st.number_input("Berat Badan (kg)", min_value=1.0, step=0.1, value=70.0)
+        height = st.number_input("Tinggi Badan (cm)", min_value=1.0, step=0.1, value=170.0)
+
+        if st.button("Hitung BMI"):
+            bmi = calculate_bmi(weight, height)
+            if bmi:
+                st.success(f"BMI Anda adalah {bmi}")
+                st.info(f"Kategori: {get_bmi_category(bmi)}")
+                
+                st.write("### Rekomendasi:")
+                recommendations = get_bmi_recommendations(bmi)
+                for rec in recommendations:
+                    st.write(f"- {rec}")
+
+    elif menu == "Riwayat":
+        st.write("Riwayat Prediksi:")
+        from history_store import get_history_store
+        store = get_history_store()
+
+        # Filter riwayat, diproses langsung oleh database tanpa memuat seluruh data
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            name_filter = st.text_input('Cari Nama (awalan)', value='')
+        with col2:
+            result_filter = st.selectbox('Hasil', ['Semua', 'Diabetes', 'Non-Diabetes'])
+        with col3:
+            page_size = st.selectbox('Baris per Halaman', [25, 50, 100, 500], index=1)
+        result_filter = None if result_filter == 'Semua' else result_filter
+
+        total = store.count(name=name_filter, result=result_filter)
+        if total == 0:
+            st.info("Belum ada riwayat prediksi.")
+        else:
+            total_pages = (total - 1) // page_size + 1
+            page = st.number_input(f'Halaman (dari {total_pages})', min_value=1, max_value=total_pages, step=1, value=1)
+            offset = (page - 1) * page_size
+            history = load_history(name=name_filter, result=result_filter, limit=page_size, offset=offset)
+
+            # Tampilkan data dengan nomor urut
+            st.write(f"### Data Riwayat Prediksi ({total} data)")
+            history.index = range(offset + 1, offset + len(history) + 1)
+            st.dataframe(history)
+            
+            # Tombol unduh halaman yang sedang ditampilkan (bukan seluruh riwayat)
+            csv = history.to_csv(index=False)
+            st.download_button(
+                label=f"Unduh Halaman {page} dari {total_pages} (CSV)",
+                data=csv,
+                file_name=f'riwayat_prediksi_diabetes_halaman_{page}.csv',
+                mime='text/csv'
+            )
+
+            # Tetap tampil setelah tombol ditekan, agar pilihan periode tren tidak menutup visualisasi
+            if st.button("Visualisasi Riwayat"):
+                st.session_state['show_history_analytics'] = True
+            if st.session_state.get('show_history_analytics'):
+                show_history_analytics(store)
+
+    elif menu == "Monitoring Drift":
+        show_drift_monitor()
+
+    elif menu == "Tentang Aplikasi":
+        show_about()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import os #mengganti file dump secara atomik
+import json #format dump metrik
+import time #mengukur durasi
+import logging #log terstruktur untuk setiap span
+import tempfile #file sementara untuk dump atomik
+import threading #mengamankan metrik dari sesi yang berjalan bersamaan
+from bisect import bisect_left #mencari bucket histogram
+from functools import wraps #dekorator pengukur waktu
+
+# Batas atas bucket histogram durasi (detik)
+DURATION_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+METRIC_PREFIX = 'diapred'
+
+_logger = logging.getLogger('metrics')
+_lock = threading.Lock()
+_counters = {}    # (nama, label) -> nilai
+_histograms = {}  # nama span -> [jumlah per bucket..., +Inf], total durasi, jumlah observasi
+_stats_providers = {}  # nama -> fungsi statistik tambahan (mis. cache hasil) untuk snapshot
+
+# Function to record one span duration
+def observe(name, seconds):
+    index = bisect_left(DURATION_BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {'buckets': [0] * (len(DURATION_BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+        histogram['buckets'][index] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(json.dumps({'span': name, 'duration_ms': round(seconds * 1e3, 4)}))
+
+# Function to increase a counter, misalnya increment('predictions_total', result='Diabetes')
+def increment(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+# Mengukur durasi satu blok kode: with span('tree_predict'): ...
+class span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+# Dekorator untuk mengukur durasi seluruh fungsi
+def timed(name):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+# Function to register extra statistics included in every snapshot, misalnya register_stats('cache', cache.stats)
+def register_stats(name, function):
+    with _lock:
+        _stats_providers[name] = function
+
+# Function to get a copy of every metric
+def snapshot():
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        spans = {name: {'count': histogram['count'],
+                        'sum_seconds': histogram['sum'],
+                        'buckets': dict(zip([str(bound) for bound in DURATION_BUCKETS] + ['+Inf'],
+                                            histogram['buckets']))}
+                 for name, histogram in sorted(_histograms.items())}
+        providers = sorted(_stats_providers.items())
+    # Dipanggil di luar lock karena penyedia statistik bisa memakai lock dan metrik sendiri
+    stats = {name: function() for name, function in providers}
+    return {'timestamp': time.time(), 'counters': counters, 'spans': spans, 'stats': stats}
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = [(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for key, value in labels]
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+# Function to render metrics in the Prometheus text exposition format
+def render_prometheus():
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((name, dict(histogram, buckets=list(histogram['buckets'])))
+                            for name, histogram in _histograms.items())
+
+    lines = []
+    seen = set()
+    for (name, labels), value in counters:
+        metric = f'{METRIC_PREFIX}_{name}'
+        if metric not in seen:
+            lines.append(f'# TYPE {metric} counter')
+            seen.add(metric)
+        lines.append(f'{metric}{_format_labels(labels)} {value}')
+
+    metric = f'{METRIC_PREFIX}_span_duration_seconds'
+    if histograms:
+        lines.append(f'# TYPE {metric} histogram')
+    for name, histogram in histograms:
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS + ['+Inf'], histogram['buckets']):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{span="{name}"}} {histogram["sum"]}')
+        lines.append(f'{metric}_count{{span="{name}"}} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+# Function to write the metric snapshot to a JSON file
+def dump_json(path):
+    # Nama file sementara unik di folder yang sama, agar beberapa proses dapat menulis dump bersamaan
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(snapshot(), file, indent=2)
+        # Diganti secara atomik agar pembaca tidak melihat file setengah jadi
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+_dump_thread = None
+
+# Function to start a background thread that dumps metrics periodically (hanya dijalankan sekali per proses)
+def start_json_dump(path, interval):
+    global _dump_thread
+    with _lock:
+        if _dump_thread is not None:
+            return
+        _dump_thread = threading.Thread(target=_dump_loop, args=(path, interval), name='metrics-dump', daemon=True)
+    _dump_thread.start()
+
+def _dump_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            dump_json(path)
+        except OSError as e:
+            logging.error(f"Error writing metrics dump: {str(e)}")
+
+# Function to clear all metrics
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -0,0 +1,105 @@
+import os #membaca metadata file artefak
+import time #mengukur lama loading
+import threading #mengamankan registry dari sesi yang berjalan bersamaan
+import logging #mencatat aktivitas loading model
+import joblib #memuat artefak model machine learning
+from metrics import span #pengukuran waktu loading
+from config import MODEL_PATH, SCALER_PATH, COMPILED_MODEL_PATH, MODEL_MMAP_MODE, USE_COMPILED_ARTIFACT
+
+# Registry global per proses: path -> (signature file, artefak)
+# Modul ini hanya di-import sekali per proses, sehingga isinya bertahan di setiap rerun Streamlit
+_registry = {}
+_lock = threading.Lock()
+ARTIFACT_EXTENSIONS = ('.pkl', '.sav')
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'reloads': 0,
+    'load_time': {}  # path -> lama loading terakhir (detik)
+}
+
+# Function to build file signature (berubah jika file pickle diganti)
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Function to get an artifact from the registry, loading it only when needed
+# Dengan MODEL_MMAP_MODE, array NumPy di artefak tanpa kompresi di-memory-map. Ganti artefak dengan
+# menulis file baru lalu rename (seperti train.py), jangan menimpa isi file yang sedang di-map.
+def get_artifact(path):
+    path = os.path.abspath(path)
+    signature = _file_signature(path)
+
+    cached = _registry.get(path)
+    if cached is not None and cached[0] == signature:
+        with _lock:
+            _stats['hits'] += 1
+        return cached[1]
+
+    with _lock:
+        # Cek ulang, mungkin sudah dimuat oleh sesi lain selagi menunggu lock
+        cached = _registry.get(path)
+        if cached is not None and cached[0] == signature:
+            _stats['hits'] += 1
+            return cached[1]
+
+        start = time.perf_counter()
+        with span('model_load'):
+            artifact = joblib.load(path, mmap_mode=MODEL_MMAP_MODE)
+        elapsed = time.perf_counter() - start
+
+        if cached is not None:
+            _stats['reloads'] += 1
+            logging.info(f"Artifact changed on disk, reloaded: {path}")
+        _stats['misses'] += 1
+        _stats['load_time'][path] = elapsed
+        _registry[path] = (signature, artifact)
+        return artifact
+
+# Function to load every artifact under the model directory (nama file tanpa ekstensi -> artefak)
+def load_all_artifacts(directory):
+    artifacts = {}
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension in ARTIFACT_EXTENSIONS:
+            artifacts[name] = get_artifact(os.path.join(directory, filename))
+    return artifacts
+
+# Function to get only the classifiers under the model directory (bukan scaler atau encoder)
+# Jika names diisi, hanya model tersebut yang dimuat
+def get_models(directory, names=None):
+    if names is None:
+        artifacts = load_all_artifacts(directory)
+    else:
+        artifacts = {}
+        for filename in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(filename)
+            if name in names and extension in ARTIFACT_EXTENSIONS:
+                artifacts[name] = get_artifact(os.path.join(directory, filename))
+    return {name: artifact for name, artifact in artifacts.items()
+            if hasattr(artifact, 'predict') and not hasattr(artifact, 'transform')}
+
+# Function to load the primary model and its scaler
+# USE_COMPILED_ARTIFACT: hanya pohon terkompilasi yang di-memory-map (scaler sudah dilipat, sklearn tidak di-import)
+def load_model_and_scaler():
+    if USE_COMPILED_ARTIFACT:
+        return get_artifact(COMPILED_MODEL_PATH), None
+    return get_artifact(MODEL_PATH), get_artifact(SCALER_PATH)
+
+# Function to get the registry generation (bertambah setiap kali ada artefak yang dimuat atau dimuat ulang)
+# Dipakai sebagai versi model oleh cache hasil prediksi
+def get_generation():
+    return _stats['misses']
+
+# Function to get registry counters
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['load_time'] = dict(_stats['load_time'])
+        stats['cached'] = list(_registry.keys())
+    return stats
+
+# Function to clear the registry (memaksa semua artefak dimuat ulang)
+def clear_registry():
+    with _lock:
+        _registry.clear()
@@ -0,0 +1,144 @@
+import time #mengukur latensi per model
+import random #pembagian request berdasarkan bobot
+import logging #mencatat error model shadow
+import threading #mengamankan statistik
+from zlib import crc32 #routing yang konsisten untuk pasien yang sama
+from concurrent.futures import ThreadPoolExecutor #menjalankan model shadow di background
+import numpy as np #untuk komputasi numerik
+from model_registry import get_models, get_generation #semua model di folder model/
+from prediction import predict_single, predict_features #pipeline prediksi
+from recommendations import get_feature_recommendations #rekomendasi kesehatan
+from result_cache import prediction_cache #cache hasil prediksi + rekomendasi
+from drift_monitor import observe_input #monitoring drift untuk input dari cache
+from metrics import increment, observe #metrik per model
+from config import MODEL_DIR, PRIMARY_MODEL, MODEL_WEIGHTS, SHADOW_MODELS, SHADOW_MAX_PENDING
+
+# Model shadow dijalankan di satu thread background agar tidak menambah latensi hasil yang ditampilkan
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-model')
+# Antrian executor tidak dibatasi, jadi jumlah job yang menunggu dibatasi di sini agar memori tidak terus bertambah
+_shadow_slots = threading.BoundedSemaphore(SHADOW_MAX_PENDING)
+_lock = threading.Lock()
+_stats = {}  # nama model -> statistik penggunaan
+
+# Hanya model yang dipakai routing atau shadow yang dimuat
+ROUTED_MODELS = set(MODEL_WEIGHTS) | set(SHADOW_MODELS) | {PRIMARY_MODEL}
+
+# Function to get the models used by the router
+def get_routed_models():
+    return get_models(MODEL_DIR, ROUTED_MODELS)
+
+def _model_stats(name):
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = {'served': 0, 'served_seconds': 0.0,
+                                'shadow': 0, 'shadow_seconds': 0.0, 'agree': 0}
+    return stats
+
+def _record(name, kind, count, seconds, agree=0):
+    with _lock:
+        stats = _model_stats(name)
+        stats[kind] += count
+        stats[f'{kind}_seconds'] += seconds
+        if kind == 'shadow':
+            stats['agree'] += agree
+    observe(f'model_{kind}_{name}', seconds)
+
+# Function to choose the model whose result is displayed
+# Jika key diisi (mis. nama pasien), pasien yang sama selalu mendapat model yang sama
+def choose_model(models, key=None):
+    weights = [(name, weight) for name, weight in sorted(MODEL_WEIGHTS.items()) if weight > 0 and name in models]
+    if not weights:
+        return PRIMARY_MODEL
+    total = sum(weight for _, weight in weights)
+    point = (crc32(key.encode('utf-8')) % 10000 / 10000 if key is not None else random.random()) * total
+    for name, weight in weights:
+        point -= weight
+        if point < 0:
+            return name
+    return weights[-1][0]
+
+# Function to score shadow models and compare them with the displayed result
+def _run_shadow(models, features, served_results, served_by, scaler):
+    for name in SHADOW_MODELS:
+        model = models.get(name)
+        if model is None or name == served_by:
+            continue
+        try:
+            start = time.perf_counter()
+            results = predict_features(features, model, scaler, record=False)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            logging.error(f"Error in shadow model {name}: {str(e)}")
+            continue
+        agree = int(np.count_nonzero(results == served_results))
+        _record(name, 'shadow', len(features), elapsed, agree)
+        increment('shadow_agreement_total', agree, model=name, agree='yes')
+        increment('shadow_agreement_total', len(features) - agree, model=name, agree='no')
+
+def _run_shadow_job(*args):
+    try:
+        _run_shadow(*args)
+    finally:
+        _shadow_slots.release()
+
+# Function to queue shadow scoring, dilewati jika antrian shadow sudah penuh (hasil yang ditampilkan tidak terpengaruh)
+def _submit_shadow(models, features, served_results, served_by, scaler):
+    if not SHADOW_MODELS:
+        return
+    if not _shadow_slots.acquire(blocking=False):
+        increment('shadow_dropped_total', len(features))
+        return
+    _shadow_executor.submit(_run_shadow_job, models, features, served_results, served_by, scaler)
+
+def _predict_single_with(models, name, input_data, scaler):
+    start = time.perf_counter()
+    result = predict_single(input_data, models[name], scaler)
+    _record(name, 'served', 1, time.perf_counter() - start)
+    _submit_shadow(models, np.asarray([input_data], dtype=np.float64), np.array([result], dtype=object), name, scaler)
+    return result
+
+# Function for single prediction through the router (raise ValueError jika input tidak valid)
+def predict_routed(input_data, scaler, key=None):
+    models = get_routed_models()
+    name = choose_model(models, key)
+    return _predict_single_with(models, name, input_data, scaler), name
+
+# Function for single prediction + recommendations through the router
+# Hasil untuk input yang sama diambil dari cache selama artefak model tidak berubah (rekomendasi berupa tuple)
+def predict_routed_with_recommendations(input_data, scaler, key=None):
+    models = get_routed_models()
+    name = choose_model(models, key)
+    cache_key = (name, tuple(float(value) for value in input_data))
+    version = get_generation()
+    cached = prediction_cache.get(cache_key, version)
+    if cached is not None:
+        # Input yang diambil dari cache tetap dicatat sebagai prediksi dan untuk monitoring drift
+        increment('predictions_total', result=cached[0])
+        observe_input(input_data)
+        return cached + (name,)
+
+    # Input tidak valid menghasilkan ValueError sehingga tidak pernah masuk cache
+    result = _predict_single_with(models, name, input_data, scaler)
+    cached = (result, tuple(get_feature_recommendations(result, input_data)))
+    prediction_cache.put(cache_key, cached, version)
+    return cached + (name,)
+
+# Function for validated feature rows through the router (semua baris memakai satu model)
+def predict_features_routed(features, scaler, key=None):
+    models = get_routed_models()
+    name = choose_model(models, key)
+    start = time.perf_counter()
+    results = predict_features(features, models[name], scaler)
+    _record(name, 'served', len(features), time.perf_counter() - start)
+    _submit_shadow(models, features, results, name, scaler)
+    return results, name
+
+# Function to get per-model latency and agreement statistics
+def get_model_stats():
+    with _lock:
+        stats = {name: dict(values) for name, values in _stats.items()}
+    for values in stats.values():
+        values['served_mean_ms'] = values['served_seconds'] / values['served'] * 1e3 if values['served'] else None
+        values['shadow_mean_ms'] = values['shadow_seconds'] / values['shadow'] * 1e3 if values['shadow'] else None
+        values['agreement_rate'] = values['agree'] / values['shadow'] if values['shadow'] else None
+    return stats
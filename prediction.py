@@ -0,0 +1,133 @@
+import numpy as np #untuk validasi dan komputasi vektor
+import pandas as pd #analisis data
+from compiled_tree import CompiledTree, get_compiled_tree #decision tree terkompilasi tanpa langkah scaling
+from metrics import span, increment #pengukuran waktu dan penghitung
+from feature_encoding import get_encoders #encoding kategori yang sama dengan data latih
+from drift_monitor import observe_input, observe_features #sketch distribusi input untuk monitoring drift
+from config import FEATURE_COLUMNS, AGE_RANGE, BMI_RANGE, HBA1C_RANGE, GLUCOSE_RANGE, USE_COMPILED_TREE
+
+# Aturan validasi range: (indeks fitur, batas nilai, pesan error)
+RANGE_CHECKS = [
+    (1, AGE_RANGE, f"Usia harus antara {AGE_RANGE[0]}-{AGE_RANGE[1]} tahun"),
+    (5, BMI_RANGE, f"BMI harus antara {BMI_RANGE[0]}-{BMI_RANGE[1]}"),
+    (6, HBA1C_RANGE, f"HbA1c harus antara {HBA1C_RANGE[0]}-{HBA1C_RANGE[1]}"),
+    (7, GLUCOSE_RANGE, f"Glukosa darah harus antara {GLUCOSE_RANGE[0]}-{GLUCOSE_RANGE[1]}"),
+]
+
+RESULT_LABELS = np.array(['Non-Diabetes', 'Diabetes'], dtype=object)
+INCOMPLETE_MESSAGE = "Data tidak lengkap atau bukan angka"
+
+# Function to validate a single input vector (raise ValueError jika tidak valid)
+def validate_input_data(input_data):
+    with span('validation'):
+        for index, (low, high), message in RANGE_CHECKS:
+            if not (low <= input_data[index] <= high):
+                increment('validation_failures_total', reason=message)
+                raise ValueError(message)
+
+# Function to validate many rows at once with NumPy masks
+def validate_batch(features):
+    # features: array 2D (n, 8) dengan urutan FEATURE_COLUMNS
+    with span('validation_batch'):
+        n = len(features)
+        reasons = np.full(n, '', dtype=object)
+
+        incomplete = np.isnan(features).any(axis=1)
+        reasons[incomplete] += INCOMPLETE_MESSAGE + "; "
+        _count_failures(INCOMPLETE_MESSAGE, incomplete)
+
+        for index, (low, high), message in RANGE_CHECKS:
+            column = features[:, index]
+            # NaN tidak dihitung dua kali, sudah ditandai sebagai data tidak lengkap
+            out_of_range = ~incomplete & ((column < low) | (column > high))
+            reasons[out_of_range] += message + "; "
+            _count_failures(message, out_of_range)
+
+        valid = reasons == ''
+        reasons[~valid] = [reason.rstrip('; ') for reason in reasons[~valid]]
+    return valid, reasons
+
+def _count_failures(message, mask):
+    failures = int(np.count_nonzero(mask))
+    if failures:
+        increment('validation_failures_total', failures, reason=message)
+
+# Function to count predictions per result (prediction berupa kode kelas 0/1)
+def _count_results(prediction):
+    for label, count in zip(RESULT_LABELS, np.bincount(prediction, minlength=len(RESULT_LABELS))):
+        if count:
+            increment('predictions_total', int(count), result=label)
+
+# Function to get the compiled decision tree for a model, atau None jika model tidak mendukung
+def _compiled_tree(model, scaler):
+    if isinstance(model, CompiledTree):
+        return model
+    if USE_COMPILED_TREE and hasattr(model, 'tree_') and hasattr(scaler, 'scale_'):
+        return get_compiled_tree(model, scaler)
+    return None
+
+# Function to predict already-validated feature rows (array 2D dengan urutan FEATURE_COLUMNS)
+# record=False dipakai untuk model shadow agar tidak ikut dihitung sebagai hasil prediksi
+# monitor=False untuk jalur offline (skoring massal, benchmark) agar tidak dicatat ke monitoring drift
+def predict_features(features, model, scaler, record=True, monitor=True):
+    compiled = _compiled_tree(model, scaler)
+    if compiled is not None:
+        # Scaling sudah dilipat ke threshold pohon terkompilasi
+        with span('tree_predict'):
+            prediction = compiled.predict(features)
+    else:
+        with span('scaling'):
+            input_scaled = scaler.transform(pd.DataFrame(features, columns=FEATURE_COLUMNS))
+        with span('tree_predict'):
+            prediction = model.predict(input_scaled)
+    prediction = prediction.astype(np.intp)
+    if record:
+        _count_results(prediction)
+        if monitor:
+            observe_features(features)
+    return RESULT_LABELS[prediction]
+
+# Function for single prediction (raise ValueError jika input tidak valid)
+def predict_single(input_data, model, scaler):
+    validate_input_data(input_data)
+    compiled = _compiled_tree(model, scaler)
+    if compiled is not None:
+        with span('tree_predict'):
+            result = RESULT_LABELS[compiled.predict_one(input_data)]
+        increment('predictions_total', result=result)
+        observe_input(input_data)
+        return result
+    return predict_features(np.asarray([input_data], dtype=np.float64), model, scaler)[0]
+
+# Function to convert input columns into model input rows (array 2D dengan urutan FEATURE_COLUMNS)
+# Kolom kategori berupa teks (label tampilan atau kelas dataset asli) di-encode dengan feature_encoding,
+# nilai lain yang bukan angka menjadi NaN
+def encode_features(data):
+    encoders = get_encoders()
+    columns = []
+    for column in FEATURE_COLUMNS:
+        values = data[column]
+        encoder = encoders.get(column)
+        if encoder is not None and not pd.api.types.is_numeric_dtype(values):
+            encoded = encoder.encode(values)
+            values = np.where(np.isnan(encoded), pd.to_numeric(values, errors='coerce'), encoded)
+        columns.append(np.asarray(pd.to_numeric(values, errors='coerce'), dtype=np.float64))
+    return np.column_stack(columns)
+
+# Function for batch prediction (satu kali scaling dan satu kali predict untuk semua baris)
+def predict_diabetes_batch(data, model, scaler, monitor=True):
+    missing = [column for column in FEATURE_COLUMNS if column not in data.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    features = encode_features(data)
+    valid, reasons = validate_batch(features)
+
+    results = np.full(len(features), None, dtype=object)
+    if valid.any():
+        results[valid] = predict_features(features[valid], model, scaler, monitor=monitor)
+
+    output = data.copy()
+    output['Hasil'] = results
+    output['Alasan Ditolak'] = reasons
+    return output
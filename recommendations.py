@@ -0,0 +1,335 @@
+# Rekomendasi kesehatan berdasarkan hasil prediksi dan faktor risiko pasien
+# Dipisahkan dari main.py agar dapat dipakai juga oleh layanan API tanpa Streamlit
+import sys #interning teks rekomendasi
+from bisect import bisect_left, bisect_right #mencari interval nilai pasien
+from functools import lru_cache, partial #teks rekomendasi yang sudah diformat dipakai ulang
+import numpy as np #lookup interval untuk banyak pasien sekaligus
+from metrics import timed #pengukuran waktu
+from config import BMI_BANDS, FEATURE_COLUMNS
+
+# Aturan rekomendasi, dievaluasi berurutan sesuai urutan tampil
+# result: aturan hanya berlaku untuk hasil prediksi tersebut (tanpa result = semua hasil)
+# feature: nama argumen get_recommendations yang diperiksa
+# categories: label -> rekomendasi, atau
+# bounds + outcomes: outcomes[i] untuk nilai di interval ke-i (None = tanpa rekomendasi)
+# strict: True jika nilai harus lebih besar dari batas (nilai > batas), False jika nilai >= batas
+# Tanpa feature, outcomes[0] selalu ditambahkan. Teks boleh memuat {value} yang diisi nilai pasien
+RECOMMENDATION_RULES = [
+    {'feature': 'smoking_status', 'categories': {
+        'Perokok Aktif': (
+            "***Status: Perokok Aktif 🚬***",
+            "- Sangat disarankan untuk berhenti merokok karena meningkatkan risiko komplikasi diabetes",
+        ),
+        'Mantan Perokok': (
+            "***Status: Mantan Perokok 🚬***",
+            "- Pertahankan untuk tidak merokok kembali dan hindari paparan asap rokok pasif",
+        ),
+        'Tidak Pernah': (
+            "***Status: Tidak Pernah Merokok ✨***",
+            "- Pertahankan gaya hidup bebas rokok Anda!",
+        ),
+    }},
+    {'feature': 'hypertension', 'bounds': [0], 'strict': True, 'outcomes': [None, (
+        "Status: Memiliki Hipertensi ⚠️",
+        "- Batasi konsumsi garam (<2300mg/hari)",
+        "- Hindari makanan tinggi sodium",
+        "- Konsumsi makanan kaya potasium seperti pisang dan alpukat",
+    )]},
+    {'feature': 'heart_disease', 'bounds': [0], 'strict': True, 'outcomes': [None, (
+        "***Status: Memiliki Penyakit Jantung ❤️***",
+        "- Rutin kontrol ke dokter jantung",
+        "- Batasi aktivitas fisik berat",
+        "- Konsumsi makanan rendah lemak jenuh",
+        "- Hindari stres berlebihan",
+    )]},
+
+    # Rekomendasi spesifik untuk hasil Diabetes
+    {'result': 'Diabetes', 'feature': 'glucose', 'bounds': [150, 200], 'strict': True, 'outcomes': [None, (
+        "Glukosa {value} mg/dL (>150) 🟡",
+        "- Waspada! Kadar gula darah Anda mulai tinggi",
+        "- Mulai batasi makanan manis dan karbohidrat tinggi",
+        "- Tingkatkan aktivitas fisik minimal 30 menit per hari",
+        "- Lakukan pemeriksaan gula darah rutin",
+        "- Konsultasi dengan ahli gizi untuk penyesuaian pola makan",
+    ), (
+        "***Glukosa {value} mg/dL (>200) 🔴***",
+        "- Kadar gula darah Anda sangat tinggi",
+        "- Kontrol gula darah secara teratur",
+        "- Periksa kadar gula darah setiap hari",
+        "- Segera Konsultasikan dengan dokter",
+    )]},
+    {'result': 'Diabetes', 'feature': 'bmi', 'bounds': [25, 30], 'strict': True, 'outcomes': [None, (
+        "***BMI {value:.1f} (Overweight) ⚠️***",
+        "- Program penurunan berat badan moderat",
+        "- Disarankan untuk konsultasi dengan ahli gizi",
+    ), (
+        "***BMI {value:.1f} (Obesitas) ⚠️***",
+        "- Program penurunan berat badan intensif",
+        "- Segera konsultasi dengan ahli gizi",
+    )]},
+    {'result': 'Diabetes', 'feature': 'hba1c', 'bounds': [6.5, 8], 'strict': True, 'outcomes': [None, (
+        "***HbA1c {value}% (>6.5) 🟡***",
+        "- Kadar HbA1c di atas normal",
+        "- Disarankan untuk konsultasi dengan dokter",
+    ), (
+        "***HbA1c {value}% (>8) 🔴***",
+        "- Kadar HbA1c sangat tinggi",
+        "- Segera konsultasikan dengan dokter",
+    )]},
+    {'result': 'Diabetes', 'outcomes': [(
+        "Rekomendasi Umum Diabetes:",
+        "- Kunjungi Dokter untuk pemeriksaan lebih lanjut",
+        "- Olahraga minimal 30 menit/hari",
+        "- Batasi konsumsi karbohidrat dan gula",
+        "- Konsumsi makanan tinggi serat",
+        "- Pantau gula darah secara rutin",
+    )]},
+
+    # Rekomendasi untuk non-diabetes dengan faktor risiko
+    {'result': 'Non-Diabetes', 'feature': 'bmi', 'bounds': [25, 30], 'strict': True, 'outcomes': [None, (
+        "***BMI {value:.1f} (Overweight) ⚠️***",
+        "- Risiko diabetes meningkat",
+        "- Pertimbangkan penurunan berat badan",
+    ), (
+        "***BMI {value:.1f} (Obesitas) ⚠️***",
+        "- Risiko tinggi diabetes",
+        "- Program penurunan berat badan diperlukan",
+        "- Konsultasi dengan dokter atau ahli gizi",
+    )]},
+    {'result': 'Non-Diabetes', 'feature': 'glucose', 'bounds': [140], 'strict': True, 'outcomes': [None, (
+        "***Glukosa {value} mg/dL (>140) ⚠️***",
+        "- Waspadai pre-diabetes",
+        "- Periksa gula darah secara berkala",
+    )]},
+    {'result': 'Non-Diabetes', 'outcomes': [(
+        "***Rekomendasi Pencegahan Diabetes:***",
+        "- Kunjungi Dokter untuk pemeriksaan lebih lanjut",
+        "- Jaga Pola hidup sehat",
+        "- Olahraga minimal 150 menit per minggu",
+        "- Jaga Pola makan seimbang",
+        "- Monitoring gula darah secara rutin",
+    )]},
+]
+
+# Rekomendasi per kategori BMI, batas kategori diambil dari BMI_BANDS
+BMI_RECOMMENDATIONS = {
+    'Kekurangan Berat Badan': (
+        "***BMI {value:.1f} (Anda Kekurangan Berat Badan) ⚠️***",
+        "- Tingkatkan asupan kalori dengan makanan bergizi",
+        "- Konsumsi protein berkualitas tinggi",
+        "- Lakukan olahraga secara teratur",
+        "- Konsultasikan dengan ahli gizi untuk program penambahan berat badan yang sehat",
+    ),
+    'Normal': (
+        "***BMI {value:.1f} (Berat Badan Anda Normal) ✅***",
+        "- Pertahankan pola makan seimbang",
+        "- Lakukan olahraga rutin minimal 150 menit per minggu",
+        "- Jaga kualitas tidur yang baik",
+        "- Lanjutkan gaya hidup sehat yang sudah dijalani",
+    ),
+    'Kelebihan Berat Badan': (
+        "***BMI {value:.1f} (Anda Kelebihan Berat Badan) ⚠️***",
+        "- Kurangi porsi makan secara bertahap",
+        "- Tingkatkan aktivitas fisik menjadi 45-60 menit per hari",
+        "- Hindari makanan tinggi gula dan lemak jenuh",
+        "- Pertimbangkan untuk berkonsultasi dengan ahli gizi",
+    ),
+    'Obesitas': (
+        "***BMI {value:.1f} (Anda Obesitas) 🔴***",
+        "- Segera konsultasi dengan dokter atau ahli gizi",
+        "- Mulai program penurunan berat badan yang aman",
+        "- Olahraga secara teratur selama minimal 30 menit setiap hari",
+        "- Catat asupan makanan harian",
+        "- Periksa kesehatan secara rutin",
+        "- Hindari makanan dan minuman tinggi lemak",
+    ),
+}
+BMI_RULES = [
+    {'feature': 'bmi', 'bounds': [low for low, _ in BMI_BANDS[1:]], 'strict': False,
+     'outcomes': [BMI_RECOMMENDATIONS[label] for _, label in BMI_BANDS]},
+]
+
+# Aturan yang sudah dikompilasi: batas interval dalam bentuk list (satu pasien) dan array (banyak pasien)
+class CompiledRule:
+    __slots__ = ('feature', 'codes', 'bounds', 'side', 'outcomes', 'templated', 'lookup')
+
+    def __init__(self, rule):
+        self.feature = rule.get('feature')
+        self.codes = None
+        self.bounds = np.asarray(rule.get('bounds', []), dtype=np.float64)
+        self.side = 'left' if rule.get('strict') else 'right'
+        if 'categories' in rule:
+            # Label kategori -> indeks outcome, label yang tidak dikenal -> outcome terakhir (None)
+            self.codes = {label: index for index, label in enumerate(rule['categories'])}
+            outcomes = list(rule['categories'].values()) + [None]
+            self.lookup = self._lookup_category
+        elif self.feature is None:
+            outcomes = rule['outcomes']
+            self.lookup = self._lookup_always
+        else:
+            outcomes = rule['outcomes']
+            self.lookup = partial(bisect_left if rule.get('strict') else bisect_right, self.bounds.tolist())
+
+        # Teks yang sama di beberapa aturan disimpan sebagai satu objek string
+        self.outcomes = [None if outcome is None else tuple(sys.intern(line) for line in outcome)
+                         for outcome in outcomes]
+        self.templated = [outcome is not None and '{value' in outcome[0] for outcome in self.outcomes]
+
+    def _lookup_category(self, value):
+        return self.codes.get(value, len(self.outcomes) - 1)
+
+    def _lookup_always(self, value):
+        return 0
+
+    # Function to find the outcome index for many values at once
+    def lookup_batch(self, values):
+        if self.codes is not None:
+            missing = len(self.outcomes) - 1
+            return np.fromiter((self.codes.get(value, missing) for value in values), dtype=np.int64, count=len(values))
+        if self.feature is None:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.searchsorted(self.bounds, np.asarray(values, dtype=np.float64), side=self.side)
+
+@lru_cache(maxsize=4096, typed=True)
+def _format_header(template, value):
+    return template.format(value=value)
+
+# Tabel aturan yang dikompilasi sekali saat modul di-import
+class CompiledRules:
+    def __init__(self, rules):
+        compiled = [(rule.get('result'), CompiledRule(rule)) for rule in rules]
+        # Aturan yang berlaku per hasil prediksi, sehingga hasil tidak dicek ulang di setiap aturan
+        self.common = tuple(rule for result, rule in compiled if result is None)
+        self.by_result = {result: tuple(rule for rule_result, rule in compiled if rule_result in (None, result))
+                          for result, _ in compiled if result is not None}
+        # Kerangka rekomendasi per kombinasi hasil aturan, dibangun sekali lalu dipakai ulang
+        self._skeletons = {}
+
+    def rules_for(self, result):
+        return self.by_result.get(result, self.common)
+
+    # Function to get the recommendation lines of one rule combination
+    # Hasil: (baris rekomendasi, [(posisi baris, indeks aturan)] untuk baris yang memuat nilai pasien)
+    def _skeleton(self, rules, combination):
+        key = (id(rules), combination)
+        skeleton = self._skeletons.get(key)
+        if skeleton is None:
+            lines, templates = [], []
+            for position, (rule, index) in enumerate(zip(rules, combination)):
+                outcome = rule.outcomes[index]
+                if outcome is None:
+                    continue
+                if rule.templated[index]:
+                    templates.append((len(lines), position))
+                lines.extend(outcome)
+            skeleton = self._skeletons[key] = (lines, tuple(templates))
+        return skeleton
+
+    # Function to evaluate the rules for one patient
+    def evaluate(self, result, values):
+        rules = self.rules_for(result)
+        patient, combination = [], []
+        for rule in rules:
+            value = values.get(rule.feature)
+            patient.append(value)
+            combination.append(rule.lookup(value))
+        lines, templates = self._skeleton(rules, tuple(combination))
+        lines = lines.copy()
+        for line, position in templates:
+            lines[line] = _format_header(lines[line], patient[position])
+        return lines
+
+    # Function to evaluate the rules for many patients in one pass
+    # Indeks interval dicari per kolom dengan searchsorted, lalu pasien dengan kombinasi hasil aturan
+    # yang sama memakai satu kerangka; per pasien hanya baris yang memuat nilai pasien yang diformat
+    def evaluate_batch(self, results, columns):
+        results = np.asarray(results, dtype=object)
+        recommendations = [None] * len(results)
+        for result in set(results.tolist()):
+            rows = np.flatnonzero(results == result)
+            rules = self.rules_for(result)
+            values = [np.asarray(columns.get(rule.feature, [None] * len(results)), dtype=object)[rows].tolist()
+                      for rule in rules]
+            indices = [rule.lookup_batch(rule_values) for rule, rule_values in zip(rules, values)]
+
+            # Satu kode per kombinasi hasil aturan
+            codes = np.zeros(len(rows), dtype=np.int64)
+            for rule, rule_indices in zip(rules, indices):
+                codes = codes * len(rule.outcomes) + rule_indices
+            _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+            skeletons = [self._skeleton(rules, tuple(int(rule_indices[row]) for rule_indices in indices))
+                         for row in first]
+
+            for member, (row, group) in enumerate(zip(rows.tolist(), inverse.reshape(-1).tolist())):
+                lines, templates = skeletons[group]
+                lines = lines.copy()
+                for line, position in templates:
+                    lines[line] = _format_header(lines[line], values[position][member])
+                recommendations[row] = lines
+        return recommendations
+
+_RULES = CompiledRules(RECOMMENDATION_RULES)
+_BMI_RULES = CompiledRules(BMI_RULES)
+
+@timed('recommendations')
+def get_recommendations(result, bmi, glucose, hba1c, smoking_status, hypertension, heart_disease, age):
+    return _RULES.evaluate(result, {
+        'bmi': bmi,
+        'glucose': glucose,
+        'hba1c': hba1c,
+        'smoking_status': smoking_status,
+        'hypertension': hypertension,
+        'heart_disease': heart_disease,
+        'age': age,
+    })
+
+# Function to build recommendations for many patients at once (setiap argumen berupa list/array per pasien)
+@timed('recommendations_batch')
+def get_recommendations_batch(results, bmi, glucose, hba1c, smoking_status, hypertension, heart_disease, age):
+    return _RULES.evaluate_batch(results, {
+        'bmi': bmi,
+        'glucose': glucose,
+        'hba1c': hba1c,
+        'smoking_status': smoking_status,
+        'hypertension': hypertension,
+        'heart_disease': heart_disease,
+        'age': age,
+    })
+
+# Function to build recommendations from a model input vector (urutan FEATURE_COLUMNS)
+# Kode riwayat merokok diubah ke label tampilan yang dipakai oleh aturan rekomendasi
+def get_feature_recommendations(result, input_data):
+    from feature_encoding import decode_code #di-import saat dipakai, encoder disusun sekali per proses
+    gender, age, hypertension, heart_disease, smoking_history, bmi, hba1c, glucose = input_data
+    return get_recommendations(
+        result,
+        bmi,
+        glucose,
+        hba1c,
+        decode_code('smoking_history', smoking_history),
+        hypertension == 1,
+        heart_disease == 1,
+        age
+    )
+
+# Function to build recommendations for many model input vectors at once
+def get_feature_recommendations_batch(results, features):
+    from feature_encoding import get_encoders #di-import saat dipakai, encoder disusun sekali per proses
+    columns = dict(zip(FEATURE_COLUMNS, features.T))
+    return get_recommendations_batch(
+        results,
+        columns['bmi'],
+        columns['blood_glucose_level'],
+        columns['HbA1c_level'],
+        get_encoders()['smoking_history'].decode(columns['smoking_history']),
+        columns['hypertension'] == 1,
+        columns['heart_disease'] == 1,
+        columns['age']
+    )
+
+def get_bmi_recommendations(bmi):
+    return _BMI_RULES.evaluate(None, {'bmi': bmi})
+
+# Function to get the BMI category label (sesuai BMI_BANDS)
+def get_bmi_category(bmi):
+    return BMI_BANDS[max(bisect_right([low for low, _ in BMI_BANDS], bmi) - 1, 0)][1]
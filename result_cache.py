@@ -0,0 +1,69 @@
+# Cache hasil prediksi + rekomendasi untuk input yang sama
+# Setiap rerun Streamlit menjalankan ulang handler tombol, sehingga input yang sama sering diprediksi ulang
+import time #waktu kedaluwarsa entri
+import threading #mengamankan cache dari sesi yang berjalan bersamaan
+from collections import OrderedDict #urutan LRU
+from metrics import increment, register_stats #penghitung hit/miss dan statistik di dump metrik
+from config import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+
+# Cache LRU dengan batas waktu per entri
+# version: seluruh isi cache dibuang jika versi berubah (mis. artefak model dimuat ulang)
+class ResultCache:
+    def __init__(self, name, max_size, ttl=None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (waktu kedaluwarsa, value)
+        self._version = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self._stats['invalidations'] += 1
+            self._entries.clear()
+            self._version = version
+
+    # Function to get a cached value, None jika tidak ada atau sudah kedaluwarsa
+    def get(self, key, version=None):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+        increment(f'{self.name}_cache_total', outcome='miss' if entry is None else 'hit')
+        return None if entry is None else entry[1]
+
+    def put(self, key, value, version=None):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Function to get cache counters and hit rate
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), max_size=self.max_size)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+        return stats
+
+# Cache hasil prediksi tunggal + rekomendasi: (nama model, input tervalidasi) -> (hasil, rekomendasi)
+prediction_cache = ResultCache('prediction', RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+register_stats('prediction_cache', prediction_cache.stats)
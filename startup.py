@@ -0,0 +1,118 @@
+# Cold start aplikasi: warm-up di background dan laporan waktu import
+# Modul ini sengaja hanya memakai library standar agar tidak menambah waktu import main.py
+import re #membaca output -X importtime
+import sys #interpreter untuk subprocess laporan
+import json #hasil pengukuran warm-up dari subprocess
+import time #mengukur durasi setiap tahap
+import logging #mencatat kegagalan warm-up
+import argparse #argumen command line
+import importlib #import modul berat secara eksplisit
+import threading #warm-up di background
+import subprocess #mengukur import di proses baru (cold start sebenarnya)
+from metrics import observe #durasi tahap warm-up sebagai span
+from config import COLD_START_BUDGET
+
+# Modul berat yang dimuat lazy oleh main.py, dimuat lebih dulu oleh warm-up
+# agar menu pertama yang membutuhkannya tidak menunggu
+WARMUP_IMPORTS = ['pandas', 'prediction', 'model_router', 'history_store', 'plotly.express']
+
+_lock = threading.Lock()
+_warmup_thread = None
+_timings = {}  # tahap warm-up -> durasi (detik)
+
+def _run_stage(name, function):
+    start = time.perf_counter()
+    try:
+        function()
+    except Exception as e:
+        logging.error(f"Warm-up stage {name} failed: {str(e)}")
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(f'warmup_{name}', elapsed)
+        with _lock:
+            _timings[name] = elapsed
+
+def _load_models():
+    from model_registry import load_model_and_scaler
+    from model_router import get_routed_models
+    from feature_encoding import get_encoders
+    load_model_and_scaler()
+    get_routed_models()
+    get_encoders()
+
+# Function to run every warm-up stage in the current thread
+# Model dimuat lebih dulu karena menu Prediksi adalah halaman pertama yang dibuka
+def warmup():
+    _run_stage('models', _load_models)
+    for module in WARMUP_IMPORTS:
+        _run_stage(f'import {module}', lambda: importlib.import_module(module))
+
+# Function to start the warm-up in a background thread (hanya dijalankan sekali per proses)
+def start_warmup():
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=warmup, name='warmup', daemon=True)
+    _warmup_thread.start()
+
+# Function to get the duration of finished warm-up stages
+def get_timings():
+    with _lock:
+        return dict(_timings)
+
+# Function to measure the import time of a module in a new interpreter, per modul yang di-import langsung
+def import_breakdown(module):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True)
+    # Format baris: "import time: <self us> | <cumulative us> | <indentasi><nama modul>"
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)', line)
+        if match:
+            entries.append((len(match.group(3)) // 2, match.group(4), int(match.group(2)) / 1e6))
+    total = next(seconds for depth, name, seconds in entries if depth == 0 and name == module)
+    # Modul yang di-import langsung oleh module (kedalaman 1, baris anak muncul sebelum induknya)
+    direct = {}
+    collecting = False
+    for depth, name, seconds in reversed(entries):
+        if depth == 0:
+            collecting = name == module
+        elif collecting and depth == 1:
+            direct[name] = seconds
+    return total, direct
+
+# Function to measure the warm-up stages in a new interpreter
+def measure_warmup(module):
+    code = f'import json, {module}, startup; startup.warmup(); print(json.dumps(startup.get_timings()))'
+    completed = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def print_report(module, total, direct, warmup_timings, budget):
+    print(f"Import {module}: {total * 1e3:.1f} ms (budget {budget * 1e3:.0f} ms)")
+    for name, seconds in sorted(direct.items(), key=lambda item: -item[1]):
+        print(f"  {name:<30} {seconds * 1e3:9.1f} ms")
+    print("Warm-up (background):")
+    for name, seconds in warmup_timings.items():
+        print(f"  {name:<30} {seconds * 1e3:9.1f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Laporan waktu cold start aplikasi")
+    parser.add_argument('--module', default='main', help="modul yang diukur waktu import-nya")
+    parser.add_argument('--budget', type=float, default=COLD_START_BUDGET, help="batas waktu import (detik)")
+    parser.add_argument('--no-warmup', action='store_true', help="lewati pengukuran warm-up")
+    parser.add_argument('--output', help="simpan laporan ke file JSON")
+    args = parser.parse_args()
+
+    total, direct = import_breakdown(args.module)
+    warmup_timings = {} if args.no_warmup else measure_warmup(args.module)
+    print_report(args.module, total, direct, warmup_timings, args.budget)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'module': args.module, 'import_seconds': total, 'imports': direct,
+                       'warmup': warmup_timings, 'budget_seconds': args.budget}, file, indent=2)
+
+    if total > args.budget:
+        print(f"Cold start over budget by {(total - args.budget) * 1e3:.1f} ms")
+        sys.exit(1)
@@ -0,0 +1,186 @@
+import os #mengelola folder artefak
+import json #manifest artefak
+import hashlib #checksum artefak
+import argparse #argumen command line
+import platform #informasi lingkungan pelatihan
+from datetime import datetime #versi artefak
+import numpy as np #untuk komputasi numerik
+import pandas as pd #analisis data
+import joblib #menyimpan model machine learning
+import sklearn #versi library untuk manifest
+from sklearn.model_selection import train_test_split #membagi data latih dan uji
+from sklearn.preprocessing import StandardScaler #normalisasi fitur
+from sklearn.tree import DecisionTreeClassifier #model utama
+from sklearn.naive_bayes import GaussianNB #model pembanding (shadow)
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+from compiled_tree import CompiledTree, verify #decision tree terkompilasi untuk cold start tanpa sklearn
+from columnar_store import iter_dataset #pembacaan dataset kolumnar
+from feature_encoding import get_encoders #encoding kategori yang sama dengan aplikasi
+from drift_monitor import build_baseline, save_baseline #baseline distribusi input untuk monitoring drift
+from config import FEATURE_COLUMNS, MODEL_VERSIONS_DIR
+
+RAW_DATA = 'dataset/diabetes.csv'
+TARGET_COLUMN = 'diabetes'
+
+# Tipe data ringkas untuk data latih yang sudah di-encode
+TRAINING_DTYPES = {
+    'gender': np.int8,
+    'age': np.float32,
+    'hypertension': np.int8,
+    'heart_disease': np.int8,
+    'smoking_history': np.int8,
+    'bmi': np.float32,
+    'HbA1c_level': np.float32,
+    'blood_glucose_level': np.float32,
+    TARGET_COLUMN: np.int8,
+}
+
+# Function to encode one raw data chunk (kolom kategori berupa teks/kategori)
+# Nilai yang tidak dikenal encoder (mis. gender Other) menjadi NaN dan barisnya dibuang, sama seperti input aplikasi
+def encode_chunk(chunk, encoders):
+    encoded = {column: encoder.encode(chunk[column]) for column, encoder in encoders.items()
+               if not pd.api.types.is_numeric_dtype(chunk[column])}
+    chunk = chunk.assign(**encoded)[FEATURE_COLUMNS + [TARGET_COLUMN]].dropna()
+    return chunk.astype(TRAINING_DTYPES)
+
+# Function to check categorical columns that are already encoded (angka) against the encoder codes
+# Kode dari encoding lain (mis. urutan LabelEncoder) tidak boleh tercampur diam-diam dengan data mentah
+def check_encoded_codes(chunk, encoders, path):
+    for column, encoder in encoders.items():
+        values = chunk[column]
+        if pd.api.types.is_numeric_dtype(values):
+            unknown = sorted(set(values.dropna().unique().tolist()) - set(encoder.codes))
+            if unknown:
+                raise ValueError(f"{path}: kolom {column} berisi kode {unknown} yang tidak sesuai dengan "
+                                 f"kode encoder {encoder.codes}")
+
+# Function to read and encode training data in chunks (memori hanya menampung data ringkas hasil encode)
+# Data dibaca dari salinan Parquet, hanya kolom fitur dan target
+def load_training_data(paths, encoders, chunksize):
+    chunks = []
+    rows_read = 0
+    for path in paths:
+        for chunk in iter_dataset(path, columns=FEATURE_COLUMNS + [TARGET_COLUMN], batch_size=chunksize):
+            rows_read += len(chunk)
+            check_encoded_codes(chunk, encoders, path)
+            chunks.append(encode_chunk(chunk, encoders))
+    data = pd.concat(chunks, ignore_index=True)
+    return data.drop_duplicates(ignore_index=True), rows_read
+
+# Function to balance classes of the training split
+def balance_classes(features, target, method, seed):
+    if method == 'none':
+        return features, target
+    rng = np.random.default_rng(seed)
+    classes, counts = np.unique(target, return_counts=True)
+    size = counts.max() if method == 'oversample' else counts.min()
+    indices = np.concatenate([
+        rng.choice(np.flatnonzero(target == label), size=size, replace=method == 'oversample' and count < size)
+        for label, count in zip(classes, counts)
+    ])
+    rng.shuffle(indices)
+    return features[indices], target[indices]
+
+def evaluate(model, features, target):
+    prediction = model.predict(features)
+    return {
+        'accuracy': accuracy_score(target, prediction),
+        'precision': precision_score(target, prediction),
+        'recall': recall_score(target, prediction),
+        'f1': f1_score(target, prediction),
+        'confusion_matrix': confusion_matrix(target, prediction).tolist(),
+    }
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Function to run the whole training pipeline and write a versioned artifact folder
+def train(paths, output_dir, version, balance, test_size, max_depth, seed, chunksize):
+    data, rows_read = load_training_data(paths, get_encoders(), chunksize)
+
+    features = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    target = data[TARGET_COLUMN].to_numpy()
+    train_features, test_features, train_target, test_target = train_test_split(
+        features, target, test_size=test_size, stratify=target, random_state=seed)
+    # Baseline drift memakai distribusi data latih sebelum penyeimbangan kelas (mendekati input produksi)
+    baseline = build_baseline(train_features)
+    # Penyeimbangan hanya pada data latih, data uji tetap memakai distribusi asli
+    train_features, train_target = balance_classes(train_features, train_target, balance, seed)
+
+    train_frame = pd.DataFrame(train_features, columns=FEATURE_COLUMNS)
+    test_frame = pd.DataFrame(test_features, columns=FEATURE_COLUMNS)
+    scaler = StandardScaler().fit(train_frame)
+    train_scaled = scaler.transform(train_frame)
+    test_scaled = scaler.transform(test_frame)
+
+    models = {
+        'dt_model': DecisionTreeClassifier(max_depth=max_depth, random_state=seed).fit(train_scaled, train_target),
+        'nb_model': GaussianNB().fit(train_scaled, train_target),
+    }
+
+    # Artefak terkompilasi hanya ditulis jika prediksinya identik dengan sklearn pada data uji
+    compiled = CompiledTree.from_sklearn(models['dt_model'], scaler)
+    mismatches = verify(compiled, models['dt_model'], scaler, test_frame)
+    if mismatches != (0, 0):
+        raise RuntimeError(f"Decision tree terkompilasi berbeda dari sklearn: {mismatches[0]} vectorized / {mismatches[1]} scalar")
+
+    # Folder sementara lalu rename, agar aplikasi tidak pernah melihat versi yang setengah jadi
+    version_dir = os.path.join(output_dir, version)
+    staging_dir = f'{version_dir}.tmp'
+    os.makedirs(staging_dir)
+    artifacts = {f'{name}.pkl': model for name, model in models.items()}
+    artifacts.update({
+        'scaler.pkl': scaler,
+        'dt_compiled.pkl': compiled,
+    })
+    for filename, artifact in artifacts.items():
+        # compress=0: array disimpan apa adanya sehingga dapat dimuat dengan mmap_mode
+        joblib.dump(artifact, os.path.join(staging_dir, filename), compress=0)
+
+    manifest = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'sources': paths,
+        'rows_read': rows_read,
+        'rows_used': len(data),
+        'class_counts': {str(label): int(count) for label, count in zip(*np.unique(target, return_counts=True))},
+        'train_rows': len(train_target),
+        'test_rows': len(test_target),
+        'params': {'balance': balance, 'test_size': test_size, 'max_depth': max_depth, 'seed': seed},
+        'feature_columns': FEATURE_COLUMNS,
+        'metrics': {name: evaluate(model, test_scaled, test_target) for name, model in models.items()},
+        'artifacts': {filename: {'sha256': file_sha256(os.path.join(staging_dir, filename)),
+                                 'bytes': os.path.getsize(os.path.join(staging_dir, filename))}
+                      for filename in artifacts},
+        'environment': {'python': platform.python_version(), 'scikit-learn': sklearn.__version__,
+                        'numpy': np.__version__, 'pandas': pd.__version__},
+    }
+    with open(os.path.join(staging_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    save_baseline(baseline, os.path.join(staging_dir, 'drift_baseline.json'))
+
+    os.rename(staging_dir, version_dir)
+    return version_dir, manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Latih ulang model prediksi diabetes dan simpan artefak berversi")
+    parser.add_argument('--data', nargs='+', default=[RAW_DATA], help="file CSV/Parquet data latih (mentah atau sudah di-encode)")
+    parser.add_argument('--output-dir', default=MODEL_VERSIONS_DIR)
+    parser.add_argument('--version', default=datetime.now().strftime('%Y%m%d-%H%M%S'))
+    parser.add_argument('--balance', choices=['oversample', 'undersample', 'none'], default='oversample')
+    parser.add_argument('--test-size', type=float, default=0.3)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    args = parser.parse_args()
+
+    version_dir, manifest = train(args.data, args.output_dir, args.version, args.balance,
+                                  args.test_size, args.max_depth, args.seed, args.chunksize)
+    print(f"Artifacts written to {version_dir}")
+    for name, metrics in manifest['metrics'].items():
+        print(f"{name}: accuracy={metrics['accuracy']:.4f} recall={metrics['recall']:.4f} f1={metrics['f1']:.4f}")
+    print(f"Set MODEL_VERSION = '{manifest['version']}' in config.py to use this version")